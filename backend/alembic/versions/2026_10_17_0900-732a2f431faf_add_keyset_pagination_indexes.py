@@ -0,0 +1,43 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 732a2f431faf
+Revises: 9186ae0dc14e
+Create Date: 2026-10-17 09:00:12.417305
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = '732a2f431faf'
+down_revision: Union[str, None] = '9186ae0dc14e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_secrets_created_by_user_id_id', 'secrets', ['created_by_user_id', 'id']),
+    ('ix_secrets_share_with_all_id', 'secrets', ['share_with_all', 'id']),
+    ('ix_secret_role_shares_role_level_secret_id', 'secret_role_shares', ['role_level', 'secret_id']),
+]
+
+def upgrade():
+    # Get database connection and inspector
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    # Composite indexes so each visibility branch can seek straight to a cursor
+    for name, table, columns in INDEXES:
+        existing_indexes = [i['name'] for i in inspector.get_indexes(table)]
+        if name not in existing_indexes:
+            op.create_index(name, table, columns)
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    for name, table, columns in INDEXES:
+        existing_indexes = [i['name'] for i in inspector.get_indexes(table)]
+        if name in existing_indexes:
+            op.drop_index(name, table)
@@ -0,0 +1,52 @@
+"""add_email_outbox
+
+Revision ID: 7debbebb4bdc
+Revises: 732a2f431faf
+Create Date: 2026-10-17 10:00:41.902214
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = '7debbebb4bdc'
+down_revision: Union[str, None] = '732a2f431faf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade():
+    # Get database connection and inspector
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    # Create email_outbox table if it doesn't exist
+    if 'email_outbox' not in inspector.get_table_names():
+        op.create_table(
+            'email_outbox',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('kind', sa.String(), nullable=False),
+            sa.Column('recipient', sa.String(), nullable=False),
+            sa.Column('payload', sa.Text(), nullable=False),
+            sa.Column('status', sa.String(), nullable=False, server_default='pending'),
+            sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+        # Index for the dispatcher's "due pending messages" query
+        op.create_index(op.f('ix_email_outbox_id'), 'email_outbox', ['id'])
+        op.create_index('ix_email_outbox_status_next_attempt_at', 'email_outbox', ['status', 'next_attempt_at'])
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'email_outbox' in inspector.get_table_names():
+        op.drop_index('ix_email_outbox_status_next_attempt_at', 'email_outbox')
+        op.drop_index(op.f('ix_email_outbox_id'), 'email_outbox')
+        op.drop_table('email_outbox')
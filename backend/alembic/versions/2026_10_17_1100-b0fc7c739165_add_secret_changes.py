@@ -0,0 +1,45 @@
+"""add_secret_changes
+
+Revision ID: b0fc7c739165
+Revises: 7debbebb4bdc
+Create Date: 2026-10-17 11:00:07.583120
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = 'b0fc7c739165'
+down_revision: Union[str, None] = '7debbebb4bdc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade():
+    # Get database connection and inspector
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    # Create the change log used for delta sync; no FK so tombstones outlive their secret
+    if 'secret_changes' not in inspector.get_table_names():
+        op.create_table(
+            'secret_changes',
+            sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+            sa.Column('secret_id', sa.Integer(), nullable=False),
+            sa.Column('change_type', sa.String(), nullable=False),
+            sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+        op.create_index(op.f('ix_secret_changes_secret_id'), 'secret_changes', ['secret_id'])
+        op.create_index(op.f('ix_secret_changes_changed_at'), 'secret_changes', ['changed_at'])
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'secret_changes' in inspector.get_table_names():
+        op.drop_index(op.f('ix_secret_changes_changed_at'), 'secret_changes')
+        op.drop_index(op.f('ix_secret_changes_secret_id'), 'secret_changes')
+        op.drop_table('secret_changes')
@@ -0,0 +1,38 @@
+"""add_version_counters
+
+Revision ID: 500d3076370a
+Revises: b0fc7c739165
+Create Date: 2026-10-17 12:00:19.208455
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = '500d3076370a'
+down_revision: Union[str, None] = 'b0fc7c739165'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade():
+    # Get database connection and inspector
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    # Create the per-scope counters backing listing ETags
+    if 'version_counters' not in inspector.get_table_names():
+        op.create_table(
+            'version_counters',
+            sa.Column('scope', sa.String(), nullable=False),
+            sa.Column('version', sa.BigInteger(), nullable=False, server_default='1'),
+            sa.PrimaryKeyConstraint('scope')
+        )
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'version_counters' in inspector.get_table_names():
+        op.drop_table('version_counters')
@@ -0,0 +1,96 @@
+"""store_ciphertext_as_binary
+
+Revision ID: e3a91c5d7f20
+Revises: 500d3076370a
+Create Date: 2026-10-17 13:00:52.671903
+
+"""
+import base64
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a91c5d7f20'
+down_revision: Union[str, None] = '500d3076370a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+secrets = sa.table(
+    'secrets',
+    sa.column('id', sa.Integer()),
+    sa.column('encrypted_data', sa.Text()),
+    sa.column('encrypted_blob', sa.LargeBinary())
+)
+
+def _copy_rows(conn, source, target, convert):
+    """
+    Copy ciphertexts from one column to the other in id-ordered batches.
+    The source is left in place, so the previous release, which only knows
+    encrypted_data, keeps reading and writing it; the application treats a
+    non-NULL encrypted_data as the current value and clears it whenever it
+    writes a secret. Rows rewritten in the meantime (target already set) are
+    left alone.
+    """
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(secrets.c.id, source)
+            .where(secrets.c.id > last_id, source.isnot(None), target.is_(None))
+            .order_by(secrets.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            secrets.update()
+            .where(secrets.c.id == sa.bindparam('row_id'), target.is_(None))
+            .values({target.name: sa.bindparam('value')}),
+            [{'row_id': row_id, 'value': convert(value)} for row_id, value in rows]
+        )
+        last_id = rows[-1][0]
+
+def upgrade():
+    # Get database connection and inspector
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = {c['name']: c for c in inspector.get_columns('secrets')}
+
+    # Nullable column without a default: no table rewrite
+    if 'encrypted_blob' not in existing_columns:
+        op.add_column('secrets', sa.Column('encrypted_blob', sa.LargeBinary(), nullable=True))
+    if not existing_columns['encrypted_data']['nullable']:
+        with op.batch_alter_table('secrets') as batch_op:
+            batch_op.alter_column('encrypted_data', existing_type=sa.Text(), nullable=True)
+
+    # Backfill in short per-batch transactions instead of one long one.
+    # encrypted_data is only cleared by later writes of each secret; once no
+    # instance of the previous release is left, a key rotation
+    # (POST /admin/key-rotation) rewrites every remaining row.
+    with op.get_context().autocommit_block():
+        _copy_rows(
+            conn,
+            secrets.c.encrypted_data,
+            secrets.c.encrypted_blob,
+            base64.urlsafe_b64decode
+        )
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = [c['name'] for c in inspector.get_columns('secrets')]
+
+    if 'encrypted_blob' in existing_columns:
+        with op.get_context().autocommit_block():
+            _copy_rows(
+                conn,
+                secrets.c.encrypted_blob,
+                secrets.c.encrypted_data,
+                lambda value: base64.urlsafe_b64encode(value).decode()
+            )
+        with op.batch_alter_table('secrets') as batch_op:
+            batch_op.drop_column('encrypted_blob')
+            batch_op.alter_column('encrypted_data', existing_type=sa.Text(), nullable=False)
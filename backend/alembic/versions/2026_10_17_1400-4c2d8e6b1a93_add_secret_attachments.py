@@ -0,0 +1,69 @@
+"""add_secret_attachments
+
+Revision ID: 4c2d8e6b1a93
+Revises: e3a91c5d7f20
+Create Date: 2026-10-17 14:00:33.140276
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = '4c2d8e6b1a93'
+down_revision: Union[str, None] = 'e3a91c5d7f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade():
+    # Get database connection and inspector
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_tables = inspector.get_table_names()
+
+    # Attachment metadata
+    if 'secret_attachments' not in existing_tables:
+        op.create_table(
+            'secret_attachments',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('secret_id', sa.Integer(), nullable=False),
+            sa.Column('filename', sa.String(), nullable=False),
+            sa.Column('content_type', sa.String(), nullable=False),
+            sa.Column('size', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.Column('chunk_size', sa.Integer(), nullable=False),
+            sa.Column('chunk_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('sha256', sa.String(), nullable=True),
+            sa.Column('created_by_user_id', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.ForeignKeyConstraint(['secret_id'], ['secrets.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['created_by_user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+        op.create_index(op.f('ix_secret_attachments_id'), 'secret_attachments', ['id'])
+        op.create_index(op.f('ix_secret_attachments_secret_id'), 'secret_attachments', ['secret_id'])
+
+    # Encrypted chunks, keyed by position so ranges read only what they need
+    if 'secret_attachment_chunks' not in existing_tables:
+        op.create_table(
+            'secret_attachment_chunks',
+            sa.Column('attachment_id', sa.Integer(), nullable=False),
+            sa.Column('chunk_index', sa.Integer(), nullable=False),
+            sa.Column('data', sa.LargeBinary(), nullable=False),
+            sa.ForeignKeyConstraint(['attachment_id'], ['secret_attachments.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('attachment_id', 'chunk_index')
+        )
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_tables = inspector.get_table_names()
+
+    if 'secret_attachment_chunks' in existing_tables:
+        op.drop_table('secret_attachment_chunks')
+
+    if 'secret_attachments' in existing_tables:
+        op.drop_index(op.f('ix_secret_attachments_secret_id'), 'secret_attachments')
+        op.drop_index(op.f('ix_secret_attachments_id'), 'secret_attachments')
+        op.drop_table('secret_attachments')
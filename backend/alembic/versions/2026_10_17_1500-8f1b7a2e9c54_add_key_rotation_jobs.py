@@ -0,0 +1,52 @@
+"""add_key_rotation_jobs
+
+Revision ID: 8f1b7a2e9c54
+Revises: 4c2d8e6b1a93
+Create Date: 2026-10-17 15:00:11.482907
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = '8f1b7a2e9c54'
+down_revision: Union[str, None] = '4c2d8e6b1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade():
+    # Get database connection and inspector
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    # Checkpointed progress of background key rotations
+    if 'key_rotation_jobs' not in inspector.get_table_names():
+        op.create_table(
+            'key_rotation_jobs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(), nullable=False, server_default='running'),
+            sa.Column('key_id', sa.String(), nullable=True),
+            sa.Column('last_secret_id', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('passes', sa.Integer(), nullable=False, server_default='1'),
+            sa.Column('rotated_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('total_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('created_by_user_id', sa.Integer(), nullable=True),
+            sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(['created_by_user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+        op.create_index(op.f('ix_key_rotation_jobs_id'), 'key_rotation_jobs', ['id'])
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'key_rotation_jobs' in inspector.get_table_names():
+        op.drop_index(op.f('ix_key_rotation_jobs_id'), 'key_rotation_jobs')
+        op.drop_table('key_rotation_jobs')
@@ -0,0 +1,76 @@
+"""add_secret_search_index
+
+Revision ID: 2b6f0d9e4a17
+Revises: 8f1b7a2e9c54
+Create Date: 2026-10-17 16:00:27.905184
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = '2b6f0d9e4a17'
+down_revision: Union[str, None] = '8f1b7a2e9c54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must stay identical to app.models.core.search_document
+SEARCH_DOCUMENT = (
+    "(setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B'))"
+)
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS secrets_fts USING fts5("
+    "title, description, content='secrets', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS secrets_fts_ai AFTER INSERT ON secrets BEGIN "
+    "INSERT INTO secrets_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS secrets_fts_ad AFTER DELETE ON secrets BEGIN "
+    "INSERT INTO secrets_fts(secrets_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS secrets_fts_au AFTER UPDATE OF title, description ON secrets BEGIN "
+    "INSERT INTO secrets_fts(secrets_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO secrets_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+]
+
+def upgrade():
+    # Get database connection and inspector
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if conn.dialect.name == 'postgresql':
+        existing_indexes = [i['name'] for i in inspector.get_indexes('secrets')]
+        if 'ix_secrets_search' not in existing_indexes:
+            # Build without blocking writes to secrets
+            with op.get_context().autocommit_block():
+                op.create_index(
+                    'ix_secrets_search',
+                    'secrets',
+                    [sa.text(SEARCH_DOCUMENT)],
+                    postgresql_using='gin',
+                    postgresql_concurrently=True
+                )
+    elif conn.dialect.name == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        # Index the rows that already exist
+        op.execute("INSERT INTO secrets_fts(secrets_fts) VALUES ('rebuild')")
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if conn.dialect.name == 'postgresql':
+        existing_indexes = [i['name'] for i in inspector.get_indexes('secrets')]
+        if 'ix_secrets_search' in existing_indexes:
+            op.drop_index('ix_secrets_search', 'secrets')
+    elif conn.dialect.name == 'sqlite':
+        for trigger in ('secrets_fts_au', 'secrets_fts_ad', 'secrets_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS secrets_fts")
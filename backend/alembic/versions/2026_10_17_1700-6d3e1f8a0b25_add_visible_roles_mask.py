@@ -0,0 +1,116 @@
+"""add_visible_roles_mask
+
+Revision ID: 6d3e1f8a0b25
+Revises: 2b6f0d9e4a17
+Create Date: 2026-10-17 17:00:48.317629
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = '6d3e1f8a0b25'
+down_revision: Union[str, None] = '2b6f0d9e4a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+ROLE_LEVELS = range(1, 8)
+
+# Indexes of the share_with_all and role share visibility branches; visibility
+# is now a bit test on secrets.visible_roles_mask, which no query reaches
+# through them
+UNUSED_INDEXES = [
+    ('ix_secrets_share_with_all_id', 'secrets', ['share_with_all', 'id']),
+    ('ix_secret_role_shares_role_level_secret_id', 'secret_role_shares', ['role_level', 'secret_id']),
+]
+
+secrets = sa.table(
+    'secrets',
+    sa.column('id', sa.Integer()),
+    sa.column('share_with_all', sa.Boolean()),
+    sa.column('min_role_level', sa.Integer()),
+    sa.column('visible_roles_mask', sa.Integer())
+)
+secret_role_shares = sa.table(
+    'secret_role_shares',
+    sa.column('secret_id', sa.Integer()),
+    sa.column('role_level', sa.Integer())
+)
+
+def _mask(share_with_all, min_role_level, min_share_level):
+    # Same rules as app.core.roles.visible_role_levels
+    if share_with_all and min_role_level:
+        lowest = min_role_level
+    elif min_share_level is not None:
+        lowest = min_share_level
+    else:
+        return 0
+    return sum(1 << level for level in ROLE_LEVELS if level >= lowest)
+
+def upgrade():
+    # Get database connection and inspector
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = [c['name'] for c in inspector.get_columns('secrets')]
+
+    if 'visible_roles_mask' not in existing_columns:
+        op.add_column(
+            'secrets',
+            sa.Column('visible_roles_mask', sa.Integer(), nullable=False, server_default='0')
+        )
+
+    # Backfill shared secrets in id-ordered batches
+    min_share_level = (
+        sa.select(sa.func.min(secret_role_shares.c.role_level))
+        .where(secret_role_shares.c.secret_id == secrets.c.id)
+        .scalar_subquery()
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(secrets.c.id, secrets.c.share_with_all, secrets.c.min_role_level, min_share_level)
+            .where(secrets.c.id > last_id)
+            .order_by(secrets.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        updates = [
+            {'row_id': row[0], 'mask': _mask(row[1], row[2], row[3])}
+            for row in rows
+        ]
+        updates = [update for update in updates if update['mask']]
+        if updates:
+            conn.execute(
+                secrets.update()
+                .where(secrets.c.id == sa.bindparam('row_id'))
+                .values(visible_roles_mask=sa.bindparam('mask')),
+                updates
+            )
+        last_id = rows[-1][0]
+
+    for name, table, columns in UNUSED_INDEXES:
+        existing_indexes = [i['name'] for i in inspector.get_indexes(table)]
+        if name in existing_indexes:
+            op.drop_index(name, table)
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = [c['name'] for c in inspector.get_columns('secrets')]
+
+    for name, table, columns in UNUSED_INDEXES:
+        existing_indexes = [i['name'] for i in inspector.get_indexes(table)]
+        if name not in existing_indexes:
+            op.create_index(name, table, columns)
+
+    if 'visible_roles_mask' in existing_columns:
+        if conn.dialect.name == 'sqlite':
+            # Native DROP COLUMN; batch mode would recreate the table and lose
+            # the search triggers
+            op.execute("ALTER TABLE secrets DROP COLUMN visible_roles_mask")
+        else:
+            op.drop_column('secrets', 'visible_roles_mask')
@@ -0,0 +1,100 @@
+"""add_secret_change_seq
+
+Revision ID: 3a7c5e9d1f42
+Revises: 6d3e1f8a0b25
+Create Date: 2026-10-17 18:00:13.540912
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7c5e9d1f42'
+down_revision: Union[str, None] = '6d3e1f8a0b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+CHANGE_LOG_SCOPE = 'changes'  # app.services.versions.CHANGE_LOG_SCOPE
+
+secret_changes = sa.table(
+    'secret_changes',
+    sa.column('id', sa.BigInteger()),
+    sa.column('seq', sa.BigInteger())
+)
+version_counters = sa.table(
+    'version_counters',
+    sa.column('scope', sa.String()),
+    sa.column('version', sa.BigInteger())
+)
+
+def upgrade():
+    # Get database connection and inspector
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = [c['name'] for c in inspector.get_columns('secret_changes')]
+
+    if 'seq' not in existing_columns:
+        op.add_column('secret_changes', sa.Column('seq', sa.BigInteger(), nullable=True))
+
+    # Existing records keep their id as seq, so clients' cursors stay valid.
+    # Records written by the previous release meanwhile get a seq when the
+    # next transaction with changes commits.
+    with op.get_context().autocommit_block():
+        last_id = 0
+        newest = conn.execute(sa.select(sa.func.max(secret_changes.c.id))).scalar() or 0
+        while last_id < newest:
+            conn.execute(
+                secret_changes.update()
+                .where(
+                    secret_changes.c.id > last_id,
+                    secret_changes.c.id <= last_id + BATCH_SIZE,
+                    secret_changes.c.seq.is_(None)
+                )
+                .values(seq=secret_changes.c.id)
+            )
+            last_id += BATCH_SIZE
+
+    # Start the commit-ordered counter above every backfilled seq
+    newest_seq = conn.execute(sa.select(sa.func.max(secret_changes.c.seq))).scalar() or 0
+    current = conn.execute(
+        sa.select(version_counters.c.version).where(version_counters.c.scope == CHANGE_LOG_SCOPE)
+    ).scalar()
+    if current is None:
+        conn.execute(version_counters.insert().values(scope=CHANGE_LOG_SCOPE, version=newest_seq))
+    elif current < newest_seq:
+        conn.execute(
+            version_counters.update()
+            .where(version_counters.c.scope == CHANGE_LOG_SCOPE)
+            .values(version=newest_seq)
+        )
+
+    existing_indexes = [i['name'] for i in inspector.get_indexes('secret_changes')]
+    if 'ix_secret_changes_seq' not in existing_indexes:
+        if conn.dialect.name == 'postgresql':
+            # Build without blocking writes to secret_changes
+            with op.get_context().autocommit_block():
+                op.create_index(
+                    'ix_secret_changes_seq',
+                    'secret_changes',
+                    ['seq'],
+                    unique=True,
+                    postgresql_concurrently=True
+                )
+        else:
+            op.create_index('ix_secret_changes_seq', 'secret_changes', ['seq'], unique=True)
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = [c['name'] for c in inspector.get_columns('secret_changes')]
+    existing_indexes = [i['name'] for i in inspector.get_indexes('secret_changes')]
+
+    if 'ix_secret_changes_seq' in existing_indexes:
+        op.drop_index('ix_secret_changes_seq', 'secret_changes')
+    if 'seq' in existing_columns:
+        with op.batch_alter_table('secret_changes') as batch_op:
+            batch_op.drop_column('seq')
+    conn.execute(version_counters.delete().where(version_counters.c.scope == CHANGE_LOG_SCOPE))
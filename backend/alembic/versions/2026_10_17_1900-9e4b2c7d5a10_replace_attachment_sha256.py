@@ -0,0 +1,43 @@
+"""replace_attachment_sha256
+
+Revision ID: 9e4b2c7d5a10
+Revises: 3a7c5e9d1f42
+Create Date: 2026-10-17 19:00:41.208317
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b2c7d5a10'
+down_revision: Union[str, None] = '3a7c5e9d1f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade():
+    # Get database connection and inspector
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = [c['name'] for c in inspector.get_columns('secret_attachments')]
+
+    # The stored values are unkeyed hashes of the plaintext; they are dropped
+    # rather than converted, since that would mean decrypting every file.
+    # Attachments uploaded before this revision are served without an ETag.
+    if 'sha256' in existing_columns:
+        with op.batch_alter_table('secret_attachments') as batch_op:
+            batch_op.drop_column('sha256')
+    if 'content_tag' not in existing_columns:
+        op.add_column('secret_attachments', sa.Column('content_tag', sa.String(), nullable=True))
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = [c['name'] for c in inspector.get_columns('secret_attachments')]
+
+    if 'content_tag' in existing_columns:
+        with op.batch_alter_table('secret_attachments') as batch_op:
+            batch_op.drop_column('content_tag')
+    if 'sha256' not in existing_columns:
+        op.add_column('secret_attachments', sa.Column('sha256', sa.String(), nullable=True))
@@ -0,0 +1,41 @@
+"""add_key_rotation_chunk_checkpoint
+
+Revision ID: 5d8a1f3c6e27
+Revises: 9e4b2c7d5a10
+Create Date: 2026-10-17 20:00:27.915630
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8a1f3c6e27'
+down_revision: Union[str, None] = '9e4b2c7d5a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade():
+    # Get database connection and inspector
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = [c['name'] for c in inspector.get_columns('key_rotation_jobs')]
+
+    # Key rotation also re-encrypts attachment chunks, checkpointed by their
+    # (attachment_id, chunk_index) primary key
+    if 'last_chunk_attachment_id' not in existing_columns:
+        op.add_column('key_rotation_jobs', sa.Column('last_chunk_attachment_id', sa.Integer(), nullable=False, server_default='0'))
+    if 'last_chunk_index' not in existing_columns:
+        op.add_column('key_rotation_jobs', sa.Column('last_chunk_index', sa.Integer(), nullable=False, server_default='0'))
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = [c['name'] for c in inspector.get_columns('key_rotation_jobs')]
+
+    with op.batch_alter_table('key_rotation_jobs') as batch_op:
+        if 'last_chunk_index' in existing_columns:
+            batch_op.drop_column('last_chunk_index')
+        if 'last_chunk_attachment_id' in existing_columns:
+            batch_op.drop_column('last_chunk_attachment_id')
@@ -0,0 +1,84 @@
+"""add_secret_change_audience
+
+Revision ID: 7b2e9f4c1d63
+Revises: 5d8a1f3c6e27
+Create Date: 2026-10-17 21:00:52.604118
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e9f4c1d63'
+down_revision: Union[str, None] = '5d8a1f3c6e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+COLUMNS = ['creator_id', 'previous_mask', 'mask']
+
+secret_changes = sa.table(
+    'secret_changes',
+    sa.column('id', sa.BigInteger()),
+    sa.column('secret_id', sa.Integer()),
+    sa.column('creator_id', sa.Integer()),
+    sa.column('previous_mask', sa.Integer()),
+    sa.column('mask', sa.Integer())
+)
+secrets = sa.table(
+    'secrets',
+    sa.column('id', sa.Integer()),
+    sa.column('created_by_user_id', sa.Integer()),
+    sa.column('visible_roles_mask', sa.Integer())
+)
+
+def upgrade():
+    # Get database connection and inspector
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = [c['name'] for c in inspector.get_columns('secret_changes')]
+
+    for name in COLUMNS:
+        if name not in existing_columns:
+            op.add_column('secret_changes', sa.Column(name, sa.Integer(), nullable=True))
+
+    # Existing records get the secret's current creator and mask; the masks
+    # they had at the time are not known. Records of secrets already deleted
+    # stay NULL and are shown to everyone until pruned.
+    def from_secret(column):
+        return (
+            sa.select(column)
+            .where(secrets.c.id == secret_changes.c.secret_id)
+            .scalar_subquery()
+        )
+
+    with op.get_context().autocommit_block():
+        last_id = 0
+        newest = conn.execute(sa.select(sa.func.max(secret_changes.c.id))).scalar() or 0
+        while last_id < newest:
+            conn.execute(
+                secret_changes.update()
+                .where(
+                    secret_changes.c.id > last_id,
+                    secret_changes.c.id <= last_id + BATCH_SIZE,
+                    secret_changes.c.creator_id.is_(None)
+                )
+                .values(
+                    creator_id=from_secret(secrets.c.created_by_user_id),
+                    previous_mask=from_secret(secrets.c.visible_roles_mask),
+                    mask=from_secret(secrets.c.visible_roles_mask)
+                )
+            )
+            last_id += BATCH_SIZE
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = [c['name'] for c in inspector.get_columns('secret_changes')]
+
+    with op.batch_alter_table('secret_changes') as batch_op:
+        for name in reversed(COLUMNS):
+            if name in existing_columns:
+                batch_op.drop_column(name)
@@ -0,0 +1,55 @@
+# backend/app/api/v1/endpoints/admin.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.core.security import CurrentUser, get_current_owner
+from app.models.core import KeyRotationJob
+from app.schemas.core import KeyRotationJobResponse
+from app.services.key_rotation import JOB_RUNNING, start_rotation
+
+router = APIRouter()
+
+@router.post("/key-rotation", response_model=KeyRotationJobResponse, status_code=202)
+async def start_key_rotation(
+    current_user: CurrentUser = Depends(get_current_owner),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Start re-encrypting every secret and attachment chunk with the current
+    ENCRYPTION_KEY. Deploy the new key first, with the old one in
+    ENCRYPTION_PREVIOUS_KEYS; the old key can be retired once the job has
+    completed.
+    """
+    running = (await db.execute(
+        select(KeyRotationJob.id).where(KeyRotationJob.status == JOB_RUNNING)
+    )).scalar()
+    if running is not None:
+        raise HTTPException(status_code=409, detail=f"Key rotation job {running} is already running")
+
+    return await start_rotation(db, current_user.id)
+
+@router.get("/key-rotation", response_model=KeyRotationJobResponse)
+async def get_latest_key_rotation(
+    current_user: CurrentUser = Depends(get_current_owner),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the progress of the most recent key rotation job"""
+    job = (await db.execute(
+        select(KeyRotationJob).order_by(KeyRotationJob.id.desc()).limit(1)
+    )).scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="No key rotation job found")
+    return job
+
+@router.get("/key-rotation/{job_id}", response_model=KeyRotationJobResponse)
+async def get_key_rotation(
+    job_id: int,
+    current_user: CurrentUser = Depends(get_current_owner),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the progress of a key rotation job"""
+    job = await db.get(KeyRotationJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Key rotation job not found")
+    return job
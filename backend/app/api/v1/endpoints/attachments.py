@@ -0,0 +1,259 @@
+# backend/app/api/v1/endpoints/attachments.py
+import re
+from typing import AsyncIterator, List, Optional, Tuple
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db, AsyncSessionLocal
+from app.core.config import settings
+from app.core.encryption import attachment_tagger, encrypt_chunk, decrypt_chunk
+from app.core.security import CurrentUser, get_current_user
+from app.models.core import Secret, SecretAttachment, SecretAttachmentChunk
+from app.schemas.core import SecretAttachmentResponse
+
+router = APIRouter()
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+async def _get_secret(db: AsyncSession, secret_id: int, user: CurrentUser, modify: bool = False) -> Secret:
+    """Load a secret, checking read access (or creator rights when modifying)"""
+    secret = await db.get(Secret, secret_id)
+    if not secret:
+        raise HTTPException(status_code=404, detail="Secret not found")
+    if modify and secret.created_by_user_id != user.id:
+        raise HTTPException(status_code=403, detail="You don't have permission to modify this secret")
+    if not secret.can_access(user):
+        raise HTTPException(status_code=403, detail="You don't have permission to access this secret")
+    return secret
+
+async def _get_attachment(db: AsyncSession, secret_id: int, attachment_id: int) -> SecretAttachment:
+    attachment = await db.get(SecretAttachment, attachment_id)
+    if not attachment or attachment.secret_id != secret_id:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    return attachment
+
+class _ChunkWriter:
+    """
+    Cuts an upload stream into fixed-size encrypted chunks and inserts them
+    in batches, so memory stays bounded by chunk size times batch size
+    """
+    def __init__(self, db: AsyncSession, attachment: SecretAttachment):
+        self.db = db
+        self.attachment_id = attachment.id
+        self.chunk_size = attachment.chunk_size
+        self.size = 0
+        self.chunk_count = 0
+        self.tag = attachment_tagger()
+        self._buffer = bytearray()
+        self._rows: List[dict] = []
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > settings.ATTACHMENT_MAX_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Attachments are limited to {settings.ATTACHMENT_MAX_SIZE} bytes"
+            )
+        self.tag.update(data)
+        self._buffer += data
+        # The last chunk is held back until the stream ends, so it can be
+        # sealed as final
+        while len(self._buffer) > self.chunk_size:
+            await self._add(bytes(self._buffer[:self.chunk_size]), is_last=False)
+            del self._buffer[:self.chunk_size]
+
+    async def finish(self) -> None:
+        # Empty files still get one (empty) final chunk, so truncation to
+        # nothing is detectable
+        await self._add(bytes(self._buffer), is_last=True)
+        self._buffer.clear()
+        await self._flush()
+
+    async def _add(self, chunk: bytes, is_last: bool) -> None:
+        self._rows.append(dict(
+            attachment_id=self.attachment_id,
+            chunk_index=self.chunk_count,
+            data=encrypt_chunk(chunk, self.attachment_id, self.chunk_count, is_last)
+        ))
+        self.chunk_count += 1
+        if len(self._rows) >= settings.ATTACHMENT_CHUNK_BATCH:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if self._rows:
+            await self.db.execute(insert(SecretAttachmentChunk), self._rows)
+            self._rows = []
+
+def _parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Resolve a single `bytes=` range to inclusive offsets. Multiple or
+    malformed ranges are ignored (the whole file is served); unsatisfiable
+    ones get a 416.
+    """
+    match = _RANGE_PATTERN.match(range_header or "")
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+async def _read_chunks(
+    attachment_id: int,
+    chunk_size: int,
+    chunk_count: int,
+    start: int,
+    end: int
+) -> AsyncIterator[bytes]:
+    """Decrypt the chunks covering [start, end], fetching a few at a time"""
+    if end < start:
+        return
+    first, last = start // chunk_size, end // chunk_size
+    # The request's session may be closed before the body is streamed
+    async with AsyncSessionLocal() as db:
+        index = first
+        while index <= last:
+            rows = (await db.execute(
+                select(SecretAttachmentChunk.chunk_index, SecretAttachmentChunk.data)
+                .where(
+                    SecretAttachmentChunk.attachment_id == attachment_id,
+                    SecretAttachmentChunk.chunk_index >= index,
+                    SecretAttachmentChunk.chunk_index <= min(index + settings.ATTACHMENT_CHUNK_BATCH - 1, last)
+                )
+                .order_by(SecretAttachmentChunk.chunk_index)
+            )).all()
+            for chunk_index, data in rows:
+                if chunk_index != index:
+                    raise RuntimeError(f"Attachment {attachment_id} is missing chunk {index}")
+                plaintext = decrypt_chunk(data, attachment_id, chunk_index, chunk_index == chunk_count - 1)
+                offset = chunk_index * chunk_size
+                yield plaintext[max(start - offset, 0):end - offset + 1]
+                index += 1
+            if not rows:
+                raise RuntimeError(f"Attachment {attachment_id} is missing chunk {index}")
+
+@router.post("/{secret_id}/attachments", response_model=SecretAttachmentResponse)
+async def upload_attachment(
+    secret_id: int,
+    request: Request,
+    filename: str = Query(..., min_length=1),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Attach a file to a secret. The request body is the raw file, streamed
+    into independently encrypted chunks; Content-Type is stored with it.
+    """
+    await _get_secret(db, secret_id, current_user, modify=True)
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.ATTACHMENT_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Attachments are limited to {settings.ATTACHMENT_MAX_SIZE} bytes"
+        )
+
+    attachment = SecretAttachment(
+        secret_id=secret_id,
+        filename=filename,
+        content_type=request.headers.get("content-type") or "application/octet-stream",
+        chunk_size=settings.ATTACHMENT_CHUNK_SIZE,
+        created_by_user_id=current_user.id
+    )
+    db.add(attachment)
+    await db.flush()
+
+    writer = _ChunkWriter(db, attachment)
+    async for data in request.stream():
+        await writer.write(data)
+    await writer.finish()
+
+    attachment.size = writer.size
+    attachment.chunk_count = writer.chunk_count
+    attachment.content_tag = writer.tag.hexdigest()
+    await db.commit()
+    await db.refresh(attachment)
+
+    return attachment
+
+@router.get("/{secret_id}/attachments", response_model=List[SecretAttachmentResponse])
+async def list_attachments(
+    secret_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List a secret's attachments"""
+    await _get_secret(db, secret_id, current_user)
+    result = await db.execute(
+        select(SecretAttachment)
+        .where(SecretAttachment.secret_id == secret_id)
+        .order_by(SecretAttachment.id)
+    )
+    return result.scalars().all()
+
+@router.get("/{secret_id}/attachments/{attachment_id}")
+async def download_attachment(
+    secret_id: int,
+    attachment_id: int,
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stream an attachment, decrypting chunk by chunk. A single `Range: bytes=`
+    range is answered with 206 and only the chunks it covers are read.
+    """
+    await _get_secret(db, secret_id, current_user)
+    attachment = await _get_attachment(db, secret_id, attachment_id)
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(attachment.filename)}",
+    }
+    if attachment.content_tag:
+        headers["ETag"] = f'"{attachment.content_tag}"'
+
+    byte_range = _parse_range(request.headers.get("range"), attachment.size)
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{attachment.size}"
+    else:
+        start, end = 0, attachment.size - 1
+        status_code = 200
+    headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        _read_chunks(attachment.id, attachment.chunk_size, attachment.chunk_count, start, end),
+        status_code=status_code,
+        media_type=attachment.content_type,
+        headers=headers
+    )
+
+@router.delete("/{secret_id}/attachments/{attachment_id}", status_code=204)
+async def delete_attachment(
+    secret_id: int,
+    attachment_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete an attachment and its chunks"""
+    await _get_secret(db, secret_id, current_user, modify=True)
+    attachment = await _get_attachment(db, secret_id, attachment_id)
+
+    await db.execute(delete(SecretAttachmentChunk).where(SecretAttachmentChunk.attachment_id == attachment.id))
+    await db.delete(attachment)
+    await db.commit()
+
+    return None
@@ -3,29 +3,32 @@ from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.security import (
+    CurrentUser,
     create_access_token,
-    verify_password,
+    verify_password_async,
     get_current_user
 )
 from app.core.config import settings
-from app.database import get_db
+from app.database import get_async_db
 from app.models.core import User
 from app.schemas.core import Token
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login(
-    db: Session = Depends(get_db),
+async def login(
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalars().first()
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -48,7 +51,7 @@ def login(
     }
 
 @router.post("/test-token", response_model=dict)
-def test_token(current_user: User = Depends(get_current_user)) -> Any:
+async def test_token(current_user: CurrentUser = Depends(get_current_user)) -> Any:
     """
     Test access token
     """
@@ -1,43 +1,180 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from typing import AsyncIterator, List, Optional, Tuple, Union
 from datetime import datetime
-from app.database import get_db
-from app.models.core import Secret, User, SecretRoleShare
-from app.schemas.core import SecretCreate, SecretUpdate, SecretResponse, SecretShareCreate, SecretRoleShareResponse
-from app.core.security import get_current_user
-from app.core.encryption import encrypt_data, decrypt_data
-from app.core.roles import RoleLevel
+from app.database import get_async_db, AsyncSessionLocal
+from app.core.config import settings
+from app.models.core import Secret, SecretRoleShare, SecretChange, SecretAttachment, SecretAttachmentChunk
+from app.schemas.core import (
+    SecretCreate,
+    SecretUpdate,
+    SecretResponse,
+    SecretSummaryResponse,
+    SecretShareCreate,
+    SecretRoleShareResponse,
+    SecretImportError,
+    SecretImportResponse,
+    SecretBatchRequest,
+    SecretBatchResponse,
+    SecretChangesResponse
+)
+from app.core.security import CurrentUser, get_current_user
+from app.core.encryption import encrypt_data_raw, decrypt_data, decrypt_many_async, encrypt_many_raw_async
+from app.core.roles import RoleLevel, role_mask, visible_role_levels
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from app.services.changes import (
+    CHANGE_CREATE,
+    CHANGE_UPDATE,
+    CHANGE_DELETE,
+    CHANGE_SHARE,
+    record_secret_change,
+    record_secret_changes
+)
+from app.services.events import get_broker, publish_secret_event
+from app.services.search import search_query, search_terms
+from app.services.visibility import get_visibility_index
+from app.services.versions import (
+    bump_versions,
+    make_etag,
+    not_modified,
+    read_versions,
+    role_scope,
+    secret_scopes,
+    vault_scope
+)
 
 router = APIRouter()
 
+def _secret_fields(secret: Secret, is_shared: Optional[bool] = None, include_description: bool = True) -> dict:
+    """Collect the response fields shared by full and summary secret responses"""
+    return dict(
+        id=secret.id,
+        title=secret.title,
+        description=secret.description if include_description else None,
+        created_by_user_id=secret.created_by_user_id,
+        created_at=secret.created_at,
+        updated_at=secret.updated_at,
+        is_password=secret.is_password,
+        is_shared=secret.is_shared if is_shared is None else is_shared,
+        share_with_all=secret.share_with_all,
+        min_role_level=secret.min_role_level,
+        role_shares=[
+            SecretRoleShareResponse(
+                id=share.id,
+                secret_id=share.secret_id,
+                role_level=share.role_level,
+                created_at=share.created_at,
+                created_by_user_id=share.created_by_user_id
+            )
+            for share in secret.role_shares
+        ]
+    )
+
+def _secret_response(secret: Secret, client_encrypted_data: str, is_shared: Optional[bool] = None) -> SecretResponse:
+    """Build the API response for a secret from its decrypted payload"""
+    return SecretResponse(
+        **_secret_fields(secret, is_shared),
+        client_encrypted_data=client_encrypted_data
+    )
+
+def _summary_options(include_description: bool) -> list:
+    """Loader options that keep the heavy columns out of summary listings"""
+    options = [defer(Secret.encrypted_blob), defer(Secret.encrypted_data)]
+    if not include_description:
+        options.append(defer(Secret.description))
+    return options
+
+async def _list_response(
+    secrets: List[Secret],
+    summary: bool,
+    include_description: bool,
+    is_shared: Optional[bool] = None
+) -> List[Union[SecretResponse, SecretSummaryResponse]]:
+    """Build a listing response, decrypting payloads unless in summary mode"""
+    if summary:
+        return [
+            SecretSummaryResponse(**_secret_fields(secret, is_shared, include_description))
+            for secret in secrets
+        ]
+
+    payloads = await decrypt_many_async([secret.ciphertext for secret in secrets])
+    return [
+        _secret_response(secret, payload, is_shared)
+        for secret, payload in zip(secrets, payloads)
+    ]
+
+async def _listing_etag(request: Request, db: AsyncSession, user: CurrentUser, scopes: List[str]) -> str:
+    """ETag of a listing built from the version counters it depends on"""
+    versions = await read_versions(db, scopes, include_global=user.role_level == RoleLevel.OWNER)
+    return make_etag(request, user.id, user.role_level, versions)
+
+def _not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+async def _announce_change(
+    db: AsyncSession,
+    change_type: str,
+    scopes: List[str],
+    secret: Optional[Secret] = None,
+    count: Optional[int] = None
+) -> None:
+    """Bump listing versions and publish the change event in the write transaction"""
+    await bump_versions(db, scopes)
+    if secret is None:
+        await publish_secret_event(db, change_type, scopes, count=count)
+        return
+    await publish_secret_event(
+        db,
+        change_type,
+        scopes,
+        secret_id=secret.id,
+        creator_id=secret.created_by_user_id,
+        mask=secret.visible_roles_mask or 0
+    )
+
 @router.post("/", response_model=SecretResponse)
-def create_secret(
+async def create_secret(
     secret: SecretCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new secret with double encryption"""
     # Second layer: server-side encryption
-    server_encrypted_data = encrypt_data(secret.client_encrypted_data)
+    server_encrypted_data = encrypt_data_raw(secret.client_encrypted_data)
     
     db_secret = Secret(
         title=secret.title,
         description=secret.description,
-        encrypted_data=server_encrypted_data,
+        encrypted_blob=server_encrypted_data,
         created_by_user_id=current_user.id,
         is_password=secret.is_password
     )
     
     db.add(db_secret)
-    db.commit()
-    db.refresh(db_secret)
+    await db.flush()
+    record_secret_change(
+        db,
+        db_secret.id,
+        CHANGE_CREATE,
+        creator_id=current_user.id,
+        previous_mask=0,
+        mask=db_secret.visible_roles_mask
+    )
+    await _announce_change(db, CHANGE_CREATE, [vault_scope(current_user.id)], secret=db_secret)
+    await db.commit()
+    await db.refresh(db_secret)
     
     return SecretResponse(
         id=db_secret.id,
         title=db_secret.title,
         description=db_secret.description,
-        client_encrypted_data=decrypt_data(db_secret.encrypted_data),
+        client_encrypted_data=decrypt_data(db_secret.ciphertext),
         created_by_user_id=db_secret.created_by_user_id,
         created_at=db_secret.created_at,
         updated_at=db_secret.updated_at,
@@ -48,124 +185,417 @@ def create_secret(
         role_shares=[]
     )
 
-@router.get("/", response_model=List[SecretResponse])
-def get_secrets(
+async def _import_items(request: Request) -> AsyncIterator[Tuple[int, Union[SecretCreate, str]]]:
+    """
+    Parse an import body into (index, item or error message) pairs.
+    NDJSON bodies are parsed line by line as they stream in; JSON arrays are
+    read whole.
+    """
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, _parse_import_item(line)
+                    index += 1
+        if buffer.strip():
+            yield index, _parse_import_item(buffer)
+        return
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    for index, item in enumerate(items):
+        yield index, _parse_import_item(item)
+
+def _parse_import_item(raw) -> Union[SecretCreate, str]:
+    try:
+        if isinstance(raw, bytes):
+            return SecretCreate.model_validate_json(raw)
+        return SecretCreate.model_validate(raw)
+    except ValidationError as e:
+        return "; ".join(
+            f"{'.'.join(str(loc) for loc in error['loc']) or 'item'}: {error['msg']}"
+            for error in e.errors()
+        )
+
+async def _insert_import_batch(db: AsyncSession, batch: List[SecretCreate], user: CurrentUser) -> List[int]:
+    """Encrypt a batch of imported secrets and insert it with one statement"""
+    ciphertexts = await encrypt_many_raw_async([item.client_encrypted_data for item in batch])
+    result = await db.execute(
+        insert(Secret).returning(Secret.id, sort_by_parameter_order=True),
+        [
+            dict(
+                title=item.title,
+                description=item.description,
+                encrypted_blob=ciphertext,
+                created_by_user_id=user.id,
+                is_password=item.is_password,
+                is_shared=False,
+                share_with_all=False
+            )
+            for item, ciphertext in zip(batch, ciphertexts)
+        ]
+    )
+    ids = list(result.scalars())
+    await record_secret_changes(db, ids, CHANGE_CREATE, creator_id=user.id)
+    return ids
+
+@router.post("/import", response_model=SecretImportResponse)
+async def import_secrets(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Bulk-create secrets from a JSON array or an NDJSON stream
+    (Content-Type: application/x-ndjson) of SecretCreate items.
+    Valid items are inserted in batches within a single transaction; invalid
+    ones are skipped and reported by their position in the input.
+    """
+    ids: List[int] = []
+    errors: List[SecretImportError] = []
+    batch: List[SecretCreate] = []
+
+    async for index, item in _import_items(request):
+        if isinstance(item, str):
+            errors.append(SecretImportError(index=index, error=item))
+            continue
+        batch.append(item)
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            ids.extend(await _insert_import_batch(db, batch, current_user))
+            batch = []
+    if batch:
+        ids.extend(await _insert_import_batch(db, batch, current_user))
+
+    if ids:
+        await _announce_change(db, CHANGE_CREATE, [vault_scope(current_user.id)], count=len(ids))
+    await db.commit()
+
+    return SecretImportResponse(imported=len(ids), ids=ids, errors=errors)
+
+@router.get("/", response_model=List[Union[SecretResponse, SecretSummaryResponse]])
+async def get_secrets(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     include_shared: bool = True,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    summary: bool = False,
+    include_description: bool = True,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all secrets the user has access to"""
-    # Start with user's own secrets
-    query = db.query(Secret).filter(Secret.created_by_user_id == current_user.id)
-    
-    if include_shared:
-        # Get secrets shared with all where user meets minimum role level
-        all_shared_query = db.query(Secret).filter(
-            Secret.share_with_all == True,
-            Secret.created_by_user_id != current_user.id
+    """
+    Get all secrets the user has access to, ordered by id.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next
+    page; cursor pages cost the same at any depth, unlike `skip`.
+    With summary=true the encrypted payload is neither loaded nor returned;
+    fetch it per secret through GET /secrets/{secret_id}.
+    Responses carry an ETag; a matching If-None-Match gets a 304 without
+    the secrets being queried. Pages served from the visibility index have
+    none: the index applies a change only once its event arrives, after the
+    version counters behind the ETag have moved.
+    """
+    visibility_index = get_visibility_index()
+    if settings.VISIBILITY_INDEX_ENABLED and visibility_index.ready:
+        after_id = decode_cursor(cursor) if cursor else 0
+        page_ids = visibility_index.list_ids(
+            current_user,
+            include_shared,
+            after_id=after_id,
+            skip=0 if cursor else skip,
+            limit=limit
         )
-        
-        # Get secrets shared with specific roles
-        role_shared_query = db.query(Secret).join(
-            SecretRoleShare
-        ).filter(
-            SecretRoleShare.role_level <= current_user.role_level,
-            Secret.created_by_user_id != current_user.id
-        )
-        
-        # Combine queries
-        query = query.union(all_shared_query).union(role_shared_query)
+        query = select(Secret).where(Secret.id.in_(page_ids))
+        if summary:
+            query = query.options(*_summary_options(include_description))
+        # The index only picks the page; access is still checked on the rows
+        secrets = [
+            secret for secret in (await db.execute(query.order_by(Secret.id))).scalars()
+            if secret.can_access(current_user)
+            and (include_shared or secret.created_by_user_id == current_user.id)
+        ]
+        if len(page_ids) == limit:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(page_ids[-1])
+        return await _list_response(secrets, summary, include_description)
+
+    scopes = [vault_scope(current_user.id)]
+    if include_shared:
+        scopes.append(role_scope(current_user.role_level))
+    etag = await _listing_etag(request, db, current_user, scopes)
+    if not_modified(request, etag):
+        return _not_modified_response(etag)
+    response.headers["ETag"] = etag
+
+    if include_shared:
+        query = select(Secret).where(Secret.access_clause(current_user))
+    else:
+        query = select(Secret).where(Secret.created_by_user_id == current_user.id)
+
+    if cursor:
+        query = query.where(Secret.id > decode_cursor(cursor))
+    if summary:
+        query = query.options(*_summary_options(include_description))
+
+    query = query.order_by(Secret.id)
+    if not cursor:
+        query = query.offset(skip)
+    secrets = (await db.execute(query.limit(limit))).scalars().all()
+
+    if secrets and len(secrets) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(secrets[-1].id)
     
-    secrets = query.offset(skip).limit(limit).all()
+    return await _list_response(secrets, summary, include_description)
+
+@router.get("/shared-with-me", response_model=List[Union[SecretResponse, SecretSummaryResponse]])
+async def get_shared_secrets(
+    request: Request,
+    response: Response,
+    summary: bool = False,
+    include_description: bool = True,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all secrets shared with the current user's role level (supports If-None-Match)"""
+    etag = await _listing_etag(request, db, current_user, [role_scope(current_user.role_level)])
+    if not_modified(request, etag):
+        return _not_modified_response(etag)
+    response.headers["ETag"] = etag
+
+    query = select(Secret).where(
+        Secret.created_by_user_id != current_user.id,
+        Secret.shared_with_clause(current_user)
+    )
+    if summary:
+        query = query.options(*_summary_options(include_description))
+
+    all_secrets = (await db.execute(query.order_by(Secret.id))).scalars().all()
     
-    return [
-        SecretResponse(
-            id=secret.id,
-            title=secret.title,
-            description=secret.description,
-            client_encrypted_data=decrypt_data(secret.encrypted_data),
-            created_by_user_id=secret.created_by_user_id,
-            created_at=secret.created_at,
-            updated_at=secret.updated_at,
-            is_password=secret.is_password,
-            is_shared=secret.is_shared,
-            share_with_all=secret.share_with_all,
-            min_role_level=secret.min_role_level,
-            role_shares=[
-                SecretRoleShareResponse(
-                    id=share.id,
-                    secret_id=share.secret_id,
-                    role_level=share.role_level,
-                    created_at=share.created_at,
-                    created_by_user_id=share.created_by_user_id
-                )
-                for share in secret.role_shares
-            ]
+    return await _list_response(all_secrets, summary, include_description, is_shared=True)
+
+@router.get("/search", response_model=List[SecretSummaryResponse])
+async def search_secrets(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Search the titles and descriptions of accessible secrets. Every word of
+    `q` must match the start of a word; results are ranked (title matches
+    first) and returned as summaries, without the encrypted payload.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return []
+
+    query = (
+        search_query(db.bind.dialect.name, current_user, terms)
+        .options(*_summary_options(include_description=True))
+        .offset(skip)
+        .limit(limit)
+    )
+    secrets = (await db.execute(query)).scalars().all()
+
+    return await _list_response(secrets, summary=True, include_description=True)
+
+async def _export_lines(user: CurrentUser) -> AsyncIterator[str]:
+    """Yield every secret the user can access as NDJSON, one chunk at a time"""
+    # The request's session may be closed before the body is streamed, so
+    # the export holds its own session (and server-side cursor)
+    async with AsyncSessionLocal() as db:
+        query = (
+            select(Secret)
+            .where(Secret.access_clause(user))
+            .order_by(Secret.id)
+            .execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
         )
-        for secret in secrets
-    ]
+        result = await db.stream(query)
+        async for chunk in result.scalars().partitions():
+            payloads = await decrypt_many_async([secret.ciphertext for secret in chunk])
+            yield "".join(
+                _secret_response(secret, payload).model_dump_json() + "\n"
+                for secret, payload in zip(chunk, payloads)
+            )
 
-@router.get("/shared-with-me", response_model=List[SecretResponse])
-def get_shared_secrets(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.get("/export")
+async def export_secrets(
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    """Get all secrets shared with the current user's role level"""
-    # Get secrets shared with all where user meets minimum role level
-    all_shared_secrets = db.query(Secret).filter(
-        Secret.share_with_all == True,
-        Secret.min_role_level <= current_user.role_level,
-        Secret.created_by_user_id != current_user.id
-    ).all()
-    
-    # Get secrets shared with specific roles
-    role_shared_secrets = db.query(Secret).join(
-        SecretRoleShare
-    ).filter(
-        SecretRoleShare.role_level == current_user.role_level,
-        Secret.created_by_user_id != current_user.id
-    ).all()
-    
-    # Combine and deduplicate secrets
-    all_secrets = list(set(all_shared_secrets + role_shared_secrets))
-    
-    return [
-        SecretResponse(
-            id=secret.id,
-            title=secret.title,
-            description=secret.description,
-            client_encrypted_data=decrypt_data(secret.encrypted_data),
-            created_by_user_id=secret.created_by_user_id,
-            created_at=secret.created_at,
-            updated_at=secret.updated_at,
-            is_password=secret.is_password,
-            is_shared=True,
-            share_with_all=secret.share_with_all,
-            min_role_level=secret.min_role_level,
-            role_shares=[
-                SecretRoleShareResponse(
-                    id=share.id,
-                    secret_id=share.secret_id,
-                    role_level=share.role_level,
-                    created_at=share.created_at,
-                    created_by_user_id=share.created_by_user_id
-                )
-                for share in secret.role_shares
-            ]
+    """
+    Stream every secret the user can access as NDJSON (one SecretResponse
+    per line), with constant memory regardless of vault size
+    """
+    return StreamingResponse(
+        _export_lines(current_user),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="secrets-export.ndjson"'}
+    )
+
+async def _read_batch(db: AsyncSession, ids: List[int], user: CurrentUser) -> SecretBatchResponse:
+    """Resolve existence and access for many secrets with a single query"""
+    requested = list(dict.fromkeys(ids))
+    if len(requested) > settings.BATCH_READ_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BATCH_READ_MAX_IDS} ids can be requested at once"
         )
-        for secret in all_secrets
-    ]
+
+    rows = (await db.execute(
+        select(Secret, Secret.access_clause(user).label("accessible"))
+        .where(Secret.id.in_(requested))
+    )).all()
+
+    accessible = {secret.id: secret for secret, can_access in rows if can_access}
+    forbidden = {secret.id for secret, can_access in rows if not can_access}
+    found = [accessible[secret_id] for secret_id in requested if secret_id in accessible]
+    payloads = await decrypt_many_async([secret.ciphertext for secret in found])
+
+    return SecretBatchResponse(
+        found=[_secret_response(secret, payload) for secret, payload in zip(found, payloads)],
+        forbidden=[secret_id for secret_id in requested if secret_id in forbidden],
+        missing=[
+            secret_id for secret_id in requested
+            if secret_id not in accessible and secret_id not in forbidden
+        ]
+    )
+
+@router.get("/batch", response_model=SecretBatchResponse)
+async def get_secrets_batch(
+    ids: List[int] = Query(...),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get many secrets by id (?ids=1&ids=2), reporting forbidden and missing ids"""
+    return await _read_batch(db, ids, current_user)
+
+@router.post("/batch", response_model=SecretBatchResponse)
+async def post_secrets_batch(
+    batch: SecretBatchRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get many secrets by id from a JSON body, for id lists too long for a URL"""
+    return await _read_batch(db, batch.ids, current_user)
+
+@router.get("/changes", response_model=SecretChangesResponse)
+async def get_secret_changes(
+    since: int = 0,
+    limit: int = Query(500, ge=1, le=1000),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get what changed since a previous sync (`since` = the last `next_since`).
+    Only changes to secrets the user could see, before or after the change,
+    are reported: visible ones come back in `changes`, deleted or no longer
+    visible ones in `removed`. When `since` predates the
+    retained history, `reset_required` tells the client to do a full resync
+    (e.g. via /secrets/export) and continue from `next_since`.
+    The sequence follows commit order, so a change shows up once its
+    transaction has committed and is never skipped by a later cursor.
+    """
+    oldest, newest = (await db.execute(
+        select(func.min(SecretChange.seq), func.max(SecretChange.seq))
+    )).one()
+    if newest is None:
+        return SecretChangesResponse(next_since=since, reset_required=since > 0)
+    if since < oldest - 1:
+        return SecretChangesResponse(next_since=newest, reset_required=True)
+
+    # Latest change per secret the user could see, in sequence order
+    latest = (await db.execute(
+        select(SecretChange.secret_id, func.max(SecretChange.seq).label("seq"))
+        .where(SecretChange.seq > since, SecretChange.seen_by_clause(current_user))
+        .group_by(SecretChange.secret_id)
+        .order_by(func.max(SecretChange.seq))
+        .limit(limit + 1)
+    )).all()
+    has_more = len(latest) > limit
+    latest = latest[:limit]
+    # Without more pages, the cursor skips past others' changes too: seqs
+    # up to `newest` had all committed when it was read
+    next_since = latest[-1].seq if has_more else max(newest, latest[-1].seq if latest else since)
+    if not latest:
+        return SecretChangesResponse(next_since=next_since)
+
+    changed_ids = [row.secret_id for row in latest]
+    visible = {
+        secret.id: secret
+        for secret in (await db.execute(
+            select(Secret).where(Secret.id.in_(changed_ids), Secret.access_clause(current_user))
+        )).scalars()
+    }
+    changed = [visible[secret_id] for secret_id in changed_ids if secret_id in visible]
+    payloads = await decrypt_many_async([secret.ciphertext for secret in changed])
+
+    return SecretChangesResponse(
+        changes=[_secret_response(secret, payload) for secret, payload in zip(changed, payloads)],
+        removed=[secret_id for secret_id in changed_ids if secret_id not in visible],
+        next_since=next_since,
+        has_more=has_more
+    )
+
+async def _event_stream(request: Request, user_id: int, role_level: int) -> AsyncIterator[str]:
+    """Relay the user's change events as server-sent events, with keep-alives"""
+    broker = get_broker()
+    subscription = broker.subscribe(user_id, role_level)
+    try:
+        yield ": connected\n\n"
+        while True:
+            try:
+                secret_event = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=settings.EVENT_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            payload = {key: secret_event[key] for key in ("type", "secret_id", "count") if key in secret_event}
+            yield f"event: {secret_event['type']}\ndata: {json.dumps(payload)}\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+@router.get("/events")
+async def secret_events(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Server-sent events for changes to secrets the user can see (or just lost
+    access to): create, update, delete and share, each with the secret_id
+    (imports carry a count instead). On a `reset` event, or after
+    reconnecting, catch up through /secrets/changes.
+    """
+    # Release the connection for the lifetime of the stream
+    user_id, role_level = current_user.id, current_user.role_level
+    await db.close()
+    return StreamingResponse(
+        _event_stream(request, user_id, role_level),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/{secret_id}", response_model=SecretResponse)
-def get_secret(
+async def get_secret(
     secret_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific secret by ID"""
-    secret = db.query(Secret).filter(Secret.id == secret_id).first()
+    secret = await db.get(Secret, secret_id)
     
     if not secret:
         raise HTTPException(status_code=404, detail="Secret not found")
@@ -174,39 +604,17 @@ def get_secret(
     if not secret.can_access(current_user):
         raise HTTPException(status_code=403, detail="You don't have permission to access this secret")
     
-    return SecretResponse(
-        id=secret.id,
-        title=secret.title,
-        description=secret.description,
-        client_encrypted_data=decrypt_data(secret.encrypted_data),
-        created_by_user_id=secret.created_by_user_id,
-        created_at=secret.created_at,
-        updated_at=secret.updated_at,
-        is_password=secret.is_password,
-        is_shared=secret.is_shared,
-        share_with_all=secret.share_with_all,
-        min_role_level=secret.min_role_level,
-        role_shares=[
-            SecretRoleShareResponse(
-                id=share.id,
-                secret_id=share.secret_id,
-                role_level=share.role_level,
-                created_at=share.created_at,
-                created_by_user_id=share.created_by_user_id
-            )
-            for share in secret.role_shares
-        ]
-    )
+    return _secret_response(secret, decrypt_data(secret.ciphertext))
 
 @router.put("/{secret_id}", response_model=SecretResponse)
-def update_secret(
+async def update_secret(
     secret_id: int,
     secret_update: SecretUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a secret"""
-    secret = db.query(Secret).filter(Secret.id == secret_id).first()
+    secret = await db.get(Secret, secret_id)
     
     if not secret:
         raise HTTPException(status_code=404, detail="Secret not found")
@@ -220,45 +628,38 @@ def update_secret(
     if secret_update.description is not None:
         secret.description = secret_update.description
     if secret_update.client_encrypted_data is not None:
-        secret.encrypted_data = encrypt_data(secret_update.client_encrypted_data)
+        secret.encrypted_blob = encrypt_data_raw(secret_update.client_encrypted_data)
+        secret.encrypted_data = None
     if secret_update.is_password is not None:
         secret.is_password = secret_update.is_password
     
-    db.commit()
-    db.refresh(secret)
-    
-    return SecretResponse(
-        id=secret.id,
-        title=secret.title,
-        description=secret.description,
-        client_encrypted_data=decrypt_data(secret.encrypted_data),
-        created_by_user_id=secret.created_by_user_id,
-        created_at=secret.created_at,
-        updated_at=secret.updated_at,
-        is_password=secret.is_password,
-        is_shared=secret.is_shared,
-        share_with_all=secret.share_with_all,
-        min_role_level=secret.min_role_level,
-        role_shares=[
-            SecretRoleShareResponse(
-                id=share.id,
-                secret_id=share.secret_id,
-                role_level=share.role_level,
-                created_at=share.created_at,
-                created_by_user_id=share.created_by_user_id
-            )
-            for share in secret.role_shares
-        ]
+    record_secret_change(
+        db,
+        secret.id,
+        CHANGE_UPDATE,
+        creator_id=secret.created_by_user_id,
+        previous_mask=secret.visible_roles_mask,
+        mask=secret.visible_roles_mask
+    )
+    await _announce_change(
+        db,
+        CHANGE_UPDATE,
+        secret_scopes(secret.created_by_user_id, secret.visible_role_levels()),
+        secret=secret
     )
+    await db.commit()
+    await db.refresh(secret)
+    
+    return _secret_response(secret, decrypt_data(secret.ciphertext))
 
 @router.delete("/{secret_id}", status_code=204)
-def delete_secret(
+async def delete_secret(
     secret_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a secret"""
-    secret = db.query(Secret).filter(Secret.id == secret_id).first()
+    secret = await db.get(Secret, secret_id)
     
     if not secret:
         raise HTTPException(status_code=404, detail="Secret not found")
@@ -266,20 +667,35 @@ def delete_secret(
     if secret.created_by_user_id != current_user.id:
         raise HTTPException(status_code=403, detail="You don't have permission to delete this secret")
     
-    db.delete(secret)
-    db.commit()
+    scopes = secret_scopes(secret.created_by_user_id, secret.visible_role_levels())
+    # Not left to ON DELETE CASCADE: SQLite does not enforce foreign keys, and
+    # reuses ids, so orphaned attachments could surface on a new secret
+    attachment_ids = select(SecretAttachment.id).where(SecretAttachment.secret_id == secret.id)
+    await db.execute(delete(SecretAttachmentChunk).where(SecretAttachmentChunk.attachment_id.in_(attachment_ids)))
+    await db.execute(delete(SecretAttachment).where(SecretAttachment.secret_id == secret.id))
+    await db.delete(secret)
+    record_secret_change(
+        db,
+        secret_id,
+        CHANGE_DELETE,
+        creator_id=secret.created_by_user_id,
+        previous_mask=secret.visible_roles_mask,
+        mask=0
+    )
+    await _announce_change(db, CHANGE_DELETE, scopes, secret=secret)
+    await db.commit()
     
     return None
 
 @router.post("/{secret_id}/share", response_model=SecretResponse)
-def share_secret(
+async def share_secret(
     secret_id: int,
     share_data: SecretShareCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Share a secret with roles"""
-    secret = db.query(Secret).filter(Secret.id == secret_id).first()
+    secret = await db.get(Secret, secret_id)
     if not secret:
         raise HTTPException(status_code=404, detail="Secret not found")
         
@@ -287,6 +703,10 @@ def share_secret(
     if secret.created_by_user_id != current_user.id and current_user.role_level != RoleLevel.OWNER:
         raise HTTPException(status_code=403, detail="You don't have permission to share this secret")
 
+    # Roles that lose access must see their listings change too
+    previous_share_levels = [share.role_level for share in secret.role_shares]
+    previous_levels = secret.visible_role_levels()
+
     # Update share_with_all and min_role_level
     secret.share_with_all = share_data.share_with_all
     secret.min_role_level = share_data.min_role_level if share_data.share_with_all else None
@@ -295,7 +715,7 @@ def share_secret(
     # If not sharing with all, handle role-based shares
     if not share_data.share_with_all and share_data.role_levels:
         # Remove existing role shares
-        db.query(SecretRoleShare).filter(SecretRoleShare.secret_id == secret.id).delete()
+        await db.execute(delete(SecretRoleShare).where(SecretRoleShare.secret_id == secret.id))
         
         # Add new role shares
         for role_level in share_data.role_levels:
@@ -309,37 +729,36 @@ def share_secret(
             #         status_code=400, 
             #         detail=f"Cannot share with role level {role_level} as it's higher than your role level"
             #     )
-                
-            share = SecretRoleShare(
-                secret_id=secret.id,
-                role_level=role_level,
-                created_by_user_id=current_user.id
-            )
-            db.add(share)
 
-    db.commit()
-    db.refresh(secret)
+        # One statement for all levels; the refresh below reloads role_shares
+        await db.execute(insert(SecretRoleShare), [
+            dict(secret_id=secret.id, role_level=role_level, created_by_user_id=current_user.id)
+            for role_level in share_data.role_levels
+        ])
+
+    # Fold the sharing rules into the visibility mask used by every read;
+    # secret_role_shares stays as the record of who shared with whom
+    share_levels = previous_share_levels
+    if not share_data.share_with_all and share_data.role_levels:
+        share_levels = share_data.role_levels
+    current_levels = visible_role_levels(secret.share_with_all, secret.min_role_level, share_levels)
+    secret.visible_roles_mask = role_mask(current_levels)
+
+    record_secret_change(
+        db,
+        secret.id,
+        CHANGE_SHARE,
+        creator_id=secret.created_by_user_id,
+        previous_mask=role_mask(previous_levels),
+        mask=secret.visible_roles_mask
+    )
+    await _announce_change(
+        db,
+        CHANGE_SHARE,
+        secret_scopes(secret.created_by_user_id, previous_levels | current_levels),
+        secret=secret
+    )
+    await db.commit()
+    await db.refresh(secret)
     
-    return SecretResponse(
-        id=secret.id,
-        title=secret.title,
-        description=secret.description,
-        client_encrypted_data=decrypt_data(secret.encrypted_data),
-        created_by_user_id=secret.created_by_user_id,
-        created_at=secret.created_at,
-        updated_at=secret.updated_at,
-        is_password=secret.is_password,
-        is_shared=secret.is_shared,
-        share_with_all=secret.share_with_all,
-        min_role_level=secret.min_role_level,
-        role_shares=[
-            SecretRoleShareResponse(
-                id=share.id,
-                secret_id=share.secret_id,
-                role_level=share.role_level,
-                created_at=share.created_at,
-                created_by_user_id=share.created_by_user_id
-            )
-            for share in secret.role_shares
-        ]
-    )
\ No newline at end of file
+    return _secret_response(secret, decrypt_data(secret.ciphertext))
\ No newline at end of file
@@ -1,8 +1,25 @@
 # backend/app/api/endpoints/users.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from app.core.security import get_password_hash, create_invitation_token, get_current_user, get_current_active_user
+from app.core.security import (
+    CurrentUser,
+    get_password_hash,
+    create_invitation_token,
+    get_current_user,
+    get_current_active_user,
+    invalidate_cached_user,
+    hashing_pool
+)
 from app.database import get_db
+from app.services.outbox import enqueue_invitation_email
+from app.services.versions import (
+    bump_versions_sync,
+    make_etag,
+    not_modified,
+    read_versions_sync,
+    team_scope,
+    team_scopes
+)
 from app.models.core import User
 from app.schemas.core import (
     UserCreate, 
@@ -43,7 +60,7 @@ def register_first_user(user: UserCreate, db: Session = Depends(get_db)):
     
     db_user = User(
         email=user.email,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=hashing_pool.run(get_password_hash, user.password),
         first_name=user.first_name,
         last_name=user.last_name,
         role_level=user.role_level,
@@ -51,6 +68,7 @@ def register_first_user(user: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
+    bump_versions_sync(db, team_scopes(db_user.role_level))
     db.commit()
     db.refresh(db_user)
     
@@ -64,7 +82,7 @@ def register_first_user(user: UserCreate, db: Session = Depends(get_db)):
 @router.post("/invite")
 def invite_user(
     invite: UserInvite,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> dict:
     """
@@ -91,7 +109,7 @@ def invite_user(
     
     # Create inactive user with invitation token
     # Set a temporary password hash that will be updated when the user accepts the invite
-    temp_password_hash = get_password_hash(token)  # Use the token itself as a temporary password
+    temp_password_hash = hashing_pool.run(get_password_hash, token)  # Use the token itself as a temporary password
     
     new_user = User(
         email=invite.email,
@@ -106,6 +124,14 @@ def invite_user(
     )
     
     db.add(new_user)
+    # Queued in the same transaction, sent by the outbox dispatcher
+    enqueue_invitation_email(
+        db,
+        email_to=invite.email,
+        user_name=invite.first_name,
+        role_name=get_role_name(invite.role_level),
+        invitation_token=token
+    )
     db.commit()
     db.refresh(new_user)
     
@@ -151,11 +177,13 @@ def accept_invitation(
     
     # Update user with new password and activate account
     user.is_active = True
-    user.hashed_password = get_password_hash(accept_data.password)
+    user.hashed_password = hashing_pool.run(get_password_hash, accept_data.password)
     user.invitation_token = None
     user.invitation_expires_at = None
+    bump_versions_sync(db, team_scopes(user.role_level))
     
     db.commit()
+    invalidate_cached_user(user.email)
     db.refresh(user)
     
     return UserRegisterResponse(
@@ -167,7 +195,7 @@ def accept_invitation(
 # Utility endpoint for testing - list all pending invitations
 @router.get("/pending-invites")
 def list_pending_invites(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> Dict[str, list]:
     """
@@ -208,13 +236,22 @@ def check_owner_exists(db: Session = Depends(get_db)):
 
 @router.get("/team-members", response_model=List[UserInDB])
 def get_team_members(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> List[User]:
     """
     Get all team members that the current user has permission to view.
     Higher role levels can see users with lower role levels.
+    Supports If-None-Match against the returned ETag.
     """
+    versions = read_versions_sync(db, [team_scope(current_user.role_level)])
+    etag = make_etag(request, current_user.id, current_user.role_level, versions)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     try:
         # Get all users with lower or equal role level
         users = db.query(User).filter(
@@ -232,7 +269,7 @@ def get_team_members(
 @router.get("/team-members/{user_id}", response_model=UserInDB)
 def get_team_member(
     user_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -266,7 +303,7 @@ def get_team_member(
 def update_team_member(
     user_id: int,
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -293,8 +330,10 @@ def update_team_member(
             user.first_name = user_update.first_name
         if user_update.last_name is not None:
             user.last_name = user_update.last_name
+        bump_versions_sync(db, team_scopes(user.role_level))
             
         db.commit()
+        invalidate_cached_user(user.email)
         db.refresh(user)
         return user
     except HTTPException as he:
@@ -308,7 +347,7 @@ def update_team_member(
 @router.delete("/team-members/{user_id}", status_code=204)
 def delete_team_member(
     user_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -332,7 +371,9 @@ def delete_team_member(
             
         # Soft delete by setting is_active to False
         user.is_active = False
+        bump_versions_sync(db, team_scopes(user.role_level))
         db.commit()
+        invalidate_cached_user(user.email)
         
         return None
     except HTTPException as he:
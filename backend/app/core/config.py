@@ -14,14 +14,89 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str = "5432"
     POSTGRES_DB: str = "password_manager"
     DATABASE_URL: str | None = None
+    ASYNC_DATABASE_URL: str | None = None
 
     # JWT Settings (for future use)
     JWT_SECRET_KEY: str = "your-secret-key"  # Change this!
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Authenticated user cache (per process); 0 disables it
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    # Password hashing pool; requests beyond workers + queue get a 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+
     # Encryption Settings
     ENCRYPTION_KEY: str = "XVmODHt8s3Ah5dsfiNcQl9xwe1Oc17VPOgihyqkQvNc="  # Change this!
+    ENCRYPTION_ENGINE: str = "aesgcm"  # "aesgcm" or "fernet"; both can always be decrypted
+    ENCRYPTION_PREVIOUS_KEYS: str = ""  # Comma-separated retired keys, still accepted for decryption
+    ENCRYPTION_POOL_SIZE: int = 4  # Worker threads for batch encryption
+    ENCRYPTION_PARALLEL_THRESHOLD: int = 64  # Batch size at which the pool is used
+    EXPORT_CHUNK_SIZE: int = 500  # Rows fetched and decrypted per step of a vault export
+    IMPORT_BATCH_SIZE: int = 1000  # Rows encrypted and inserted per statement of a bulk import
+    BATCH_READ_MAX_IDS: int = 500  # Ids accepted by a single /secrets/batch request
+
+    # Delta sync: how long change records / tombstones are kept
+    SECRET_CHANGE_RETENTION_DAYS: int = 30
+    SECRET_CHANGE_PRUNE_INTERVAL_SECONDS: int = 3600
+
+    # Frontend / branding used in outgoing emails
+    FRONTEND_URL: str = "http://localhost:5173"
+    COMPANY_NAME: str = "Password Manager"
+
+    # Email delivery: "console" logs messages, "smtp" or "sendgrid" sends them.
+    # For local testing point SMTP at a stand-in, e.g.
+    # `python -m aiosmtpd -n -l localhost:1025` with SMTP_USE_TLS=false.
+    EMAIL_TRANSPORT: str = "console"
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 1025
+    SMTP_USER: str | None = None
+    SMTP_PASSWORD: str | None = None
+    SMTP_FROM: str = "no-reply@localhost"
+    SMTP_USE_TLS: bool = False
+    SENDGRID_API_KEY: str | None = None
+    SENDGRID_FROM_EMAIL: str = "no-reply@localhost"
+    SENDGRID_INVITATION_TEMPLATE_ID: str | None = None
+
+    # Outbox dispatcher for emails written alongside invitations
+    EMAIL_OUTBOX_ENABLED: bool = True
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5.0
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_BACKOFF_SECONDS: int = 30  # Doubled after every failed attempt
+
+    # Secret attachments, stored as independently encrypted chunks
+    ATTACHMENT_CHUNK_SIZE: int = 64 * 1024
+    ATTACHMENT_MAX_SIZE: int = 100 * 1024 * 1024
+    ATTACHMENT_CHUNK_BATCH: int = 16  # Chunks per INSERT / SELECT while streaming
+
+    # Background re-encryption of secrets with the current key
+    KEY_ROTATION_BATCH_SIZE: int = 200
+    KEY_ROTATION_CHUNK_BATCH_SIZE: int = 32  # Attachment chunks per batch, each up to ATTACHMENT_CHUNK_SIZE
+    KEY_ROTATION_BATCH_DELAY_SECONDS: float = 0.5  # Pause between batches to spare foreground traffic
+    KEY_ROTATION_POLL_SECONDS: float = 10.0
+
+    # In-process index of visible secret ids per creator and role, kept
+    # current from change events; listings fall back to SQL until it is built
+    VISIBILITY_INDEX_ENABLED: bool = False
+
+    # Change notifications pushed to /secrets/events subscribers
+    EVENT_BROKER: str | None = None  # "postgres" or "memory"; defaults by database dialect
+    EVENT_CHANNEL: str = "secret_events"
+    EVENT_QUEUE_SIZE: int = 100  # Per subscriber; overflowing clients are told to resync
+    EVENT_KEEPALIVE_SECONDS: float = 15.0
+
+    # Prometheus metrics, served at /metrics (per process)
+    METRICS_ENABLED: bool = True
+
+    # SQL instrumentation: SQL_DEBUG adds per-request X-DB-* headers and logs;
+    # slow statements and suspected N+1 repeats are logged either way (0 disables)
+    SQL_DEBUG: bool = False
+    SLOW_QUERY_MS: float = 500.0
+    N_PLUS_ONE_THRESHOLD: int = 10  # Identical statements per request
     
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
@@ -34,6 +109,19 @@ class Settings(BaseSettings):
             f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@"
             f"{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
+
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        """
+        Returns the async override URL, or the sync URL with its driver
+        swapped for the asyncio one (asyncpg / aiosqlite)
+        """
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        scheme, rest = self.SQLALCHEMY_DATABASE_URI.split("://", 1)
+        dialect = scheme.split("+", 1)[0]
+        driver = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}.get(dialect)
+        return f"{dialect}+{driver}://{rest}" if driver else f"{scheme}://{rest}"
     
     class Config:
         case_sensitive = True
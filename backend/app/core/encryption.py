@@ -1,32 +1,376 @@
 # backend/app/core/encryption.py
-from cryptography.fernet import Fernet
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Dict, List, Optional, Sequence, Type, Union
+
+from cryptography.fernet import Fernet, MultiFernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from app.core.config import settings
+from app.core.metrics import CRYPTO_SECONDS
 
-# Initialize Fernet instance with the encryption key
-def get_fernet():
-    if not hasattr(settings, 'ENCRYPTION_KEY'):
-        # Generate a new key if not exists
-        settings.ENCRYPTION_KEY = Fernet.generate_key()
-    return Fernet(settings.ENCRYPTION_KEY)
+# Every ciphertext starts with a one-byte version header. Fernet tokens always
+# begin with 0x80, so stored Fernet data is recognised without any migration.
+FERNET_VERSION = 0x80
+AESGCM_VERSION = 0x01
 
-def encrypt_data(data: str) -> str:
+AESGCM_NONCE_SIZE = 12
+KEY_ID_SIZE = 4
+
+_encrypt_timer = CRYPTO_SECONDS.labels("encrypt")
+_decrypt_timer = CRYPTO_SECONDS.labels("decrypt")
+_encrypt_chunk_timer = CRYPTO_SECONDS.labels("encrypt_chunk")
+_decrypt_chunk_timer = CRYPTO_SECONDS.labels("decrypt_chunk")
+
+
+class CipherEngine:
+    """
+    Base class for server-side cipher engines.
+
+    Engines work on raw envelopes (bytes whose first byte is the engine
+    version); encrypt_data/decrypt_data take care of the text encoding.
+    """
+    version: int
+
+    def encrypt(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decrypt(self, envelope: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class FernetEngine(CipherEngine):
+    """
+    Legacy Fernet (AES-128-CBC + HMAC-SHA256) engine. Tokens carry no key
+    id, so with several keys every one of them is tried on decryption.
+    """
+    version = FERNET_VERSION
+
+    def __init__(self, key: Union[str, Sequence[str]]):
+        if isinstance(key, str):
+            self._fernet = Fernet(key)
+        else:
+            self._fernet = MultiFernet([Fernet(k) for k in key])
+
+    def encrypt(self, data: bytes) -> bytes:
+        return base64.urlsafe_b64decode(self._fernet.encrypt(data))
+
+    def decrypt(self, envelope: bytes) -> bytes:
+        return self._fernet.decrypt(base64.urlsafe_b64encode(envelope))
+
+
+class AESGCMEngine(CipherEngine):
+    """
+    AES-256-GCM engine.
+
+    Envelope layout: version (1) | key id (4) | nonce (12) | ciphertext + tag.
+    The header is authenticated as associated data.
+    """
+    version = AESGCM_VERSION
+
+    def __init__(self, key: str):
+        # Derive a dedicated key rather than reusing the Fernet key material
+        derived_key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"ncrypt-aesgcm-v1",
+        ).derive(base64.urlsafe_b64decode(key))
+        self.key_id = hashlib.sha256(derived_key).digest()[:KEY_ID_SIZE]
+        self._aesgcm = AESGCM(derived_key)
+
+    def encrypt(self, data: bytes, associated_data: bytes = b"") -> bytes:
+        header = bytes([self.version]) + self.key_id
+        nonce = os.urandom(AESGCM_NONCE_SIZE)
+        return header + nonce + self._aesgcm.encrypt(nonce, data, header + associated_data)
+
+    def decrypt(self, envelope: bytes, associated_data: bytes = b"") -> bytes:
+        header_size = 1 + KEY_ID_SIZE
+        header = envelope[:header_size]
+        if header[1:] != self.key_id:
+            raise ValueError("Ciphertext was encrypted with an unknown key")
+        nonce = envelope[header_size:header_size + AESGCM_NONCE_SIZE]
+        return self._aesgcm.decrypt(
+            nonce,
+            envelope[header_size + AESGCM_NONCE_SIZE:],
+            header + associated_data
+        )
+
+
+ENGINES: Dict[str, Type[CipherEngine]] = {
+    "fernet": FernetEngine,
+    "aesgcm": AESGCMEngine,
+}
+
+ENGINE_VERSIONS: Dict[int, str] = {
+    engine.version: name for name, engine in ENGINES.items()
+}
+
+
+@lru_cache
+def get_engine(name: str) -> CipherEngine:
+    """Get the process-wide instance of a cipher engine"""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown encryption engine: {name}")
+    return ENGINES[name](settings.ENCRYPTION_KEY)
+
+
+def get_cipher() -> CipherEngine:
+    """Get the engine used for new ciphertexts"""
+    return get_engine(settings.ENCRYPTION_ENGINE)
+
+
+def get_fernet() -> Fernet:
+    """Get the cached Fernet instance"""
+    return get_engine("fernet")._fernet
+
+
+def get_keys() -> List[str]:
+    """The current key followed by the previous keys still accepted for decryption"""
+    previous = [key.strip() for key in settings.ENCRYPTION_PREVIOUS_KEYS.split(",") if key.strip()]
+    return [settings.ENCRYPTION_KEY] + previous
+
+
+class Keyring:
+    """
+    Decryption engines for every configured key. AES-GCM envelopes name
+    their key id, so the right key is picked directly; Fernet tokens fall
+    back to MultiFernet.
+    """
+    def __init__(self, keys: Sequence[str]):
+        self._aesgcm: Dict[bytes, AESGCMEngine] = {}
+        for key in keys:
+            engine = AESGCMEngine(key)
+            self._aesgcm.setdefault(engine.key_id, engine)
+        self._fernet = FernetEngine(keys)
+
+    def engine_for(self, envelope: bytes) -> CipherEngine:
+        if envelope[0] == FERNET_VERSION:
+            return self._fernet
+        if envelope[0] == AESGCM_VERSION:
+            engine = self._aesgcm.get(envelope[1:1 + KEY_ID_SIZE])
+            if engine is None:
+                raise ValueError("Ciphertext was encrypted with an unknown key")
+            return engine
+        raise ValueError(f"Unknown ciphertext version: {envelope[0]:#x}")
+
+
+@lru_cache
+def get_keyring() -> Keyring:
+    """Get the process-wide keyring"""
+    return Keyring(get_keys())
+
+
+@lru_cache
+def _attachment_tag_key() -> bytes:
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b"ncrypt-attachment-tag-v1",
+    ).derive(base64.urlsafe_b64decode(settings.ENCRYPTION_KEY))
+
+
+def attachment_tagger() -> "hmac.HMAC":
+    """
+    Keyed digest (HMAC-SHA256) of an attachment's plaintext, fed as it
+    streams in. Unlike a plain hash, it cannot be used to confirm guesses
+    of the file contents without the key.
+    """
+    return hmac.new(_attachment_tag_key(), digestmod=hashlib.sha256)
+
+
+def _engine_for_envelope(envelope: bytes) -> CipherEngine:
+    return get_keyring().engine_for(envelope)
+
+
+def current_envelope_prefix() -> Optional[bytes]:
+    """
+    Header every envelope written with the current key starts with, or None
+    when the current engine (Fernet) does not identify its key
+    """
+    cipher = get_cipher()
+    if isinstance(cipher, AESGCMEngine):
+        return bytes([cipher.version]) + cipher.key_id
+    return None
+
+
+def current_chunk_prefix() -> bytes:
+    """
+    Header every attachment chunk written with the current key starts with;
+    chunks are always AES-GCM, whatever the engine for secrets
+    """
+    engine = get_engine("aesgcm")
+    return bytes([engine.version]) + engine.key_id
+
+
+def encrypt_data_raw(data: str) -> bytes:
     """
-    Encrypt a string using Fernet symmetric encryption
+    Encrypt a string into a raw envelope, for binary (bytea) storage
     """
     if not data:
-        return ""
-    
-    fernet = get_fernet()
-    encrypted_data = fernet.encrypt(data.encode())
-    return encrypted_data.decode()
+        return b""
+
+    with _encrypt_timer.time():
+        return get_cipher().encrypt(data.encode())
+
+
+def encrypt_data(data: str) -> str:
+    """
+    Encrypt a string with the configured cipher engine
+    """
+    return base64.urlsafe_b64encode(encrypt_data_raw(data)).decode()
+
 
-def decrypt_data(encrypted_data: str) -> str:
+def decrypt_data(encrypted_data: Union[str, bytes]) -> str:
     """
-    Decrypt a string that was encrypted using Fernet
+    Decrypt a raw envelope, or its base64 text form, produced by any
+    supported cipher engine
     """
     if not encrypted_data:
         return ""
-    
-    fernet = get_fernet()
-    decrypted_data = fernet.decrypt(encrypted_data.encode())
-    return decrypted_data.decode()
\ No newline at end of file
+
+    if isinstance(encrypted_data, str):
+        envelope = base64.urlsafe_b64decode(encrypted_data)
+    else:
+        envelope = bytes(encrypted_data)
+    with _decrypt_timer.time():
+        return _engine_for_envelope(envelope).decrypt(envelope).decode()
+
+
+def _chunk_associated_data(attachment_id: int, chunk_index: int, is_last: bool) -> bytes:
+    # Binding the position stops chunks being swapped, reordered or dropped
+    return struct.pack(">QQ?", attachment_id, chunk_index, is_last)
+
+
+def encrypt_chunk(data: bytes, attachment_id: int, chunk_index: int, is_last: bool) -> bytes:
+    """
+    Encrypt one attachment chunk with AES-GCM, authenticating its attachment,
+    position and whether it is the final chunk
+    """
+    with _encrypt_chunk_timer.time():
+        return get_engine("aesgcm").encrypt(
+            data,
+            _chunk_associated_data(attachment_id, chunk_index, is_last)
+        )
+
+
+def decrypt_chunk(envelope: bytes, attachment_id: int, chunk_index: int, is_last: bool) -> bytes:
+    """
+    Decrypt one attachment chunk; fails if it was moved or the file truncated
+    """
+    envelope = bytes(envelope)
+    if envelope[:1] != bytes([AESGCM_VERSION]):
+        raise ValueError("Attachment chunks must be AES-GCM envelopes")
+    with _decrypt_chunk_timer.time():
+        return _engine_for_envelope(envelope).decrypt(
+            envelope,
+            _chunk_associated_data(attachment_id, chunk_index, is_last)
+        )
+
+
+@lru_cache
+def get_crypto_pool() -> ThreadPoolExecutor:
+    """Get the bounded thread pool used for batch encryption"""
+    return ThreadPoolExecutor(
+        max_workers=settings.ENCRYPTION_POOL_SIZE,
+        thread_name_prefix="crypto"
+    )
+
+
+def _chunks(items: Sequence[str]) -> List[Sequence[str]]:
+    chunk_size = -(-len(items) // settings.ENCRYPTION_POOL_SIZE)
+    return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def _apply(func, chunk: Sequence[str]) -> List[str]:
+    return [func(item) for item in chunk]
+
+
+def _run_batch(func, items: Sequence[str]) -> List[str]:
+    # Small batches are cheaper to run inline than to hand off to the pool
+    if len(items) < settings.ENCRYPTION_PARALLEL_THRESHOLD:
+        return _apply(func, items)
+
+    results = get_crypto_pool().map(partial(_apply, func), _chunks(items))
+    return [value for chunk in results for value in chunk]
+
+
+async def _run_batch_async(func, items: Sequence[str]) -> List[str]:
+    # Same as _run_batch, but waits for the pool without blocking the event loop
+    if len(items) < settings.ENCRYPTION_PARALLEL_THRESHOLD:
+        return _apply(func, items)
+
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*(
+        loop.run_in_executor(get_crypto_pool(), _apply, func, chunk)
+        for chunk in _chunks(items)
+    ))
+    return [value for chunk in results for value in chunk]
+
+
+def encrypt_many(items: Sequence[str]) -> List[str]:
+    """
+    Encrypt a batch of strings, in parallel for large batches
+    """
+    return _run_batch(encrypt_data, items)
+
+
+def encrypt_many_raw(items: Sequence[str]) -> List[bytes]:
+    """
+    Encrypt a batch of strings into raw envelopes, in parallel for large batches
+    """
+    return _run_batch(encrypt_data_raw, items)
+
+
+def decrypt_many(items: Sequence[Union[str, bytes]]) -> List[str]:
+    """
+    Decrypt a batch of strings, in parallel for large batches
+    """
+    return _run_batch(decrypt_data, items)
+
+
+async def encrypt_many_async(items: Sequence[str]) -> List[str]:
+    """
+    Encrypt a batch of strings from async code
+    """
+    return await _run_batch_async(encrypt_data, items)
+
+
+async def encrypt_many_raw_async(items: Sequence[str]) -> List[bytes]:
+    """
+    Encrypt a batch of strings into raw envelopes from async code
+    """
+    return await _run_batch_async(encrypt_data_raw, items)
+
+
+async def decrypt_many_async(items: Sequence[Union[str, bytes]]) -> List[str]:
+    """
+    Decrypt a batch of strings from async code
+    """
+    return await _run_batch_async(decrypt_data, items)
+
+
+def _reencrypt_chunk(item: tuple) -> bytes:
+    envelope, attachment_id, chunk_index, is_last = item
+    return encrypt_chunk(
+        decrypt_chunk(envelope, attachment_id, chunk_index, is_last),
+        attachment_id,
+        chunk_index,
+        is_last
+    )
+
+
+async def reencrypt_chunks_async(items: Sequence[tuple]) -> List[bytes]:
+    """
+    Re-encrypt attachment chunks with the current key from async code; items
+    are (envelope, attachment_id, chunk_index, is_last)
+    """
+    return await _run_batch_async(_reencrypt_chunk, items)
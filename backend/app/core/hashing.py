@@ -0,0 +1,82 @@
+# backend/app/core/hashing.py
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+from fastapi import HTTPException, status
+
+class WaitStats:
+    """Running statistics of how long jobs waited for a free worker"""
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "total_seconds": self.total_seconds,
+                "max_seconds": self.max_seconds,
+            }
+
+class HashingPool:
+    """
+    Bounded worker pool for password hashing.
+
+    bcrypt releases the GIL, so a few threads keep hashing off the event
+    loop and the request threadpool. At most `workers + max_queue` jobs are
+    admitted; beyond that callers get an immediate 503 instead of queueing.
+    """
+    def __init__(self, workers: int, max_queue: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.max_pending = workers + max_queue
+        self.pending = 0
+        self.queue_wait = WaitStats()
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        """Queue a hashing job, or raise 503 when the pool is saturated"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+        queued_at = time.perf_counter()
+
+        def run():
+            self.queue_wait.observe(time.perf_counter() - queued_at)
+            return func(*args)
+
+        try:
+            future = self._executor.submit(run)
+        except Exception:
+            self._release()
+            raise
+        # Fires on completion and on cancellation of a still queued job,
+        # which never reaches run()
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a hashing job from synchronous code"""
+        return self.submit(func, *args).result()
+
+    async def run_async(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a hashing job without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(func, *args))
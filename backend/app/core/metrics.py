@@ -0,0 +1,165 @@
+# backend/app/core/metrics.py
+import time
+from typing import Dict, Iterator, List, Optional, Pattern, Tuple
+from prometheus_client import Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Requests that match no route share one label, so scanners cannot blow up
+# the number of series
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request until its response body was sent",
+    ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being served",
+    ["method", "route"]
+)
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time a request waited for a pooled database connection",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+CRYPTO_SECONDS = Histogram(
+    "crypto_operation_seconds",
+    "Time spent encrypting or decrypting one value or attachment chunk",
+    ["operation"],
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+)
+
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "Time spent in bcrypt, excluding the wait for a hashing worker",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.5, 5.0)
+)
+
+def _compile_templates(paths) -> List[Tuple[Pattern, str]]:
+    # Literal segments win over parameters, as in route declaration order:
+    # /secrets/search is not /secrets/{secret_id}
+    return [
+        (compile_path(path)[0], path)
+        for path in sorted(paths, key=lambda path: path.count("{"))
+    ]
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording in-flight requests and per-route latency.
+    Routes are labelled by their template (/secrets/{secret_id}), and the
+    timer stops once the body is sent, so streamed responses are included.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._templates: Optional[List[Tuple[Pattern, str]]] = None
+
+    def _resolve_route(self, scope: Scope) -> str:
+        """
+        Template of the route a request will be served by, before the router
+        has run. Included routers keep their routes out of reach, so their
+        templates come from the application's OpenAPI paths; routes declared
+        on the application itself (/metrics, /docs) are added directly.
+        """
+        if self._templates is None:
+            app = scope["app"]
+            paths = set(app.openapi().get("paths", {}))
+            paths.update(route.path for route in app.router.routes if getattr(route, "path", None))
+            self._templates = _compile_templates(paths)
+        for pattern, template in self._templates:
+            if pattern.match(scope["path"]):
+                return template
+        return UNMATCHED_ROUTE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        # Resolved once, so both metrics label a request alike
+        route = self._resolve_route(scope)
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            HTTP_REQUEST_SECONDS.labels(method, route, str(status_code)).observe(
+                time.perf_counter() - started
+            )
+
+class PoolCollector(Collector):
+    """Current size and usage of the SQLAlchemy connection pools"""
+    def __init__(self, engines: Dict[str, Engine]):
+        self.engines = engines
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        connections = GaugeMetricFamily(
+            "db_pool_connections",
+            "Pooled connections by state",
+            labels=["engine", "state"]
+        )
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            # Only queue pools (the default outside in-memory SQLite) keep counts
+            if not isinstance(pool, QueuePool):
+                continue
+            size.add_metric([name], pool.size())
+            connections.add_metric([name, "checked_out"], pool.checkedout())
+            connections.add_metric([name, "idle"], pool.checkedin())
+            connections.add_metric([name, "overflow"], max(pool.overflow(), 0))
+        yield size
+        yield connections
+
+class HashingPoolCollector(Collector):
+    """Backlog and queue wait of the password hashing pool"""
+    def __init__(self, pool):
+        self.pool = pool
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        stats = self.pool.queue_wait.snapshot()
+        yield GaugeMetricFamily(
+            "password_hash_pending",
+            "Hashing jobs queued or running",
+            value=self.pool.pending
+        )
+        yield GaugeMetricFamily(
+            "password_hash_capacity",
+            "Hashing jobs admitted before requests get a 503",
+            value=self.pool.max_pending
+        )
+        yield CounterMetricFamily(
+            "password_hash_queue_wait_seconds",
+            "Total time hashing jobs waited for a free worker",
+            value=stats["total_seconds"]
+        )
+        yield CounterMetricFamily(
+            "password_hash_jobs",
+            "Hashing jobs started",
+            value=stats["count"]
+        )
+        yield GaugeMetricFamily(
+            "password_hash_queue_wait_max_seconds",
+            "Longest wait for a hashing worker since startup",
+            value=stats["max_seconds"]
+        )
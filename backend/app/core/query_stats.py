@@ -0,0 +1,112 @@
+# backend/app/core/query_stats.py
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+class RequestQueries:
+    """SQL statements executed while serving one request"""
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float, executemany: bool = False) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        # Batched writes repeat their statement by design
+        if not executemany:
+            self.statements[statement] += 1
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def repeated(self, threshold: int):
+        """Statements run at least `threshold` times, most repeated first"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+# Set by QueryStatsMiddleware for the duration of a request; threadpool
+# endpoints see it too, since Starlette copies the context into the thread
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+def _short(statement: str, limit: int = 500) -> str:
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - context._query_started
+    queries = current_queries.get()
+    if queries is not None:
+        queries.record(statement, seconds, executemany)
+    # Parameters are never logged: they carry ciphertexts and password hashes
+    if settings.SLOW_QUERY_MS and seconds * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning("Slow query (%.1f ms): %s", seconds * 1000, _short(statement))
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on the engine (use async_engine.sync_engine for async)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+class QueryStatsMiddleware:
+    """
+    Collects the statements of each request. Repeated identical statements
+    (same SQL, any parameters) are logged as a suspected N+1. With SQL_DEBUG,
+    the query count and database time are added as response headers and
+    logged with the slowest statement. Statements run after the response
+    has started (streamed bodies) are not in the headers.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = current_queries.set(queries)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.SQL_DEBUG:
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(queries.count)
+                headers["X-DB-Time-Ms"] = f"{queries.total_seconds * 1000:.1f}"
+                headers["X-DB-Slowest-Ms"] = f"{queries.slowest_seconds * 1000:.1f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_queries.reset(token)
+            self._report(scope, queries)
+
+    def _report(self, scope: Scope, queries: RequestQueries) -> None:
+        request = f"{scope['method']} {scope['path']}"
+        if settings.N_PLUS_ONE_THRESHOLD:
+            for statement, count in queries.repeated(settings.N_PLUS_ONE_THRESHOLD):
+                logger.warning("Suspected N+1 in %s: %d x %s", request, count, _short(statement))
+        if settings.SQL_DEBUG and queries.count:
+            logger.info(
+                "%s: %d queries in %.1f ms, slowest %.1f ms: %s",
+                request,
+                queries.count,
+                queries.total_seconds * 1000,
+                queries.slowest_seconds * 1000,
+                _short(queries.slowest_statement or "")
+            )
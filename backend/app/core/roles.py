@@ -1,6 +1,6 @@
 # backend/app/core/roles.py
 from enum import IntEnum
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Set
 
 class RoleLevel(IntEnum):
     INTERN = 1
@@ -45,4 +45,35 @@ def get_subordinate_roles(role_level: int) -> List[int]:
 
 def can_manage_role(manager_role: int, target_role: int) -> bool:
     """Check if a role can manage another role."""
-    return manager_role > target_role
\ No newline at end of file
+    return manager_role > target_role
+
+def visible_role_levels(
+    share_with_all: bool,
+    min_role_level: Optional[int],
+    role_share_levels: Iterable[int]
+) -> Set[int]:
+    """
+    Role levels a secret is shared with, following Secret.can_access
+    (the owner and creator bypass is not included).
+    """
+    if share_with_all and min_role_level:
+        return {level for level in RoleLevel if level >= min_role_level}
+    share_levels = list(role_share_levels)
+    if share_levels:
+        return {level for level in RoleLevel if level >= min(share_levels)}
+    return set()
+
+def role_bit(level: int) -> int:
+    """Bit of a role level in a visibility mask (bit L is role level L)"""
+    return 1 << level
+
+def role_mask(levels: Iterable[int]) -> int:
+    """Visibility mask with the bits of the given role levels set"""
+    mask = 0
+    for level in levels:
+        mask |= role_bit(level)
+    return mask
+
+def mask_role_levels(mask: int) -> Set[int]:
+    """Role levels whose bit is set in a visibility mask"""
+    return {level for level in RoleLevel if mask & role_bit(level)}
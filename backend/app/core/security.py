@@ -1,13 +1,19 @@
 # backend/app/core/security.py
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.database import get_db
+from app.core.hashing import HashingPool
+from app.core.metrics import PASSWORD_HASH_SECONDS
+from app.core.roles import RoleLevel
+from app.database import get_async_db
 from app.models.core import User
 import secrets
 import string
@@ -15,16 +21,37 @@ import string
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated pool for bcrypt work, so login storms cannot starve other requests
+hashing_pool = HashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
+
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# Identity of recently authenticated users, keyed by token subject (email).
+# Entries are dropped by invalidate_cached_user() when a user changes, and
+# otherwise expire after USER_CACHE_TTL_SECONDS (other workers' caches only
+# see a change once their entry expires).
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE if settings.USER_CACHE_TTL_SECONDS > 0 else 0,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    with PASSWORD_HASH_SECONDS.labels("verify").time():
+        return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hash a password."""
-    return pwd_context.hash(password)
+    with PASSWORD_HASH_SECONDS.labels("hash").time():
+        return pwd_context.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool."""
+    return await hashing_pool.run_async(verify_password, plain_password, hashed_password)
 
 def create_invitation_token() -> str:
     """Create a secure random token for user invitations."""
@@ -46,10 +73,39 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     )
     return encoded_jwt
 
+@dataclass(frozen=True)
+class CurrentUser:
+    """
+    Identity of the authenticated user, as served by the dependencies below.
+    Not attached to a session: load the User row for anything else.
+    """
+    id: int
+    email: str
+    role_level: int
+    is_active: bool
+
+def invalidate_cached_user(email: str) -> None:
+    """Drop a user from the authentication cache after it was modified"""
+    user_cache.invalidate(email)
+
+async def _load_user(db: AsyncSession, email: str) -> Optional[CurrentUser]:
+    """Load a user's identity by email, from the cache when possible"""
+    identity = user_cache.get(email)
+    if identity is None:
+        result = await db.execute(
+            select(User.id, User.email, User.role_level, User.is_active).where(User.email == email)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        identity = CurrentUser(id=row.id, email=row.email, role_level=row.role_level, is_active=row.is_active)
+        user_cache.set(email, identity)
+    return identity
+
 async def get_current_user(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: str = Depends(oauth2_scheme)
-) -> User:
+) -> CurrentUser:
     """Get the current authenticated user."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,7 +124,7 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
         
-    user = db.query(User).filter(User.email == email).first()
+    user = await _load_user(db, email)
     if user is None:
         raise credentials_exception
     if not user.is_active:
@@ -78,9 +134,20 @@ async def get_current_user(
         )
     return user
 
+def get_current_owner(
+    current_user: CurrentUser = Depends(get_current_user)
+) -> CurrentUser:
+    """Get the current user, who must be the Owner."""
+    if current_user.role_level != RoleLevel.OWNER:
+        raise HTTPException(
+            status_code=403,
+            detail="Only the owner can perform this action"
+        )
+    return current_user
+
 def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: CurrentUser = Depends(get_current_user)
+) -> CurrentUser:
     """Get the current active user."""
     if not current_user.is_active:
         raise HTTPException(
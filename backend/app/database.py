@@ -1,7 +1,12 @@
-from sqlalchemy import create_engine
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_SECONDS
 
 engine = create_engine(
     settings.SQLALCHEMY_DATABASE_URI,
@@ -13,6 +18,21 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async stack for endpoints that run on the event loop
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+    pool_pre_ping=True,
+    pool_size=5,
+    max_overflow=10
+)
+
+# Objects stay loaded after commit: lazy loads are not possible under asyncio
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 def get_db():
@@ -21,6 +41,50 @@ def get_db():
     """
     db = SessionLocal()
     try:
+        # Check out the connection up front, so the wait for the pool is measured
+        started = time.perf_counter()
+        db.connection()
+        DB_POOL_CHECKOUT_SECONDS.labels("sync").observe(time.perf_counter() - started)
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """
+    Dependency function to get an async database session
+    """
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        await db.connection()
+        DB_POOL_CHECKOUT_SECONDS.labels("async").observe(time.perf_counter() - started)
         yield db
+
+class QueryCounter:
+    """Statements executed while a count_queries() block is active"""
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+@contextmanager
+def count_queries(bind=None) -> Iterator[QueryCounter]:
+    """
+    Count the SQL statements executed inside the block (by default on both
+    the sync and async engines), e.g. to assert that an endpoint does not
+    regress into N+1 loading
+    """
+    binds = [bind] if bind is not None else [engine, async_engine.sync_engine]
+    counter = QueryCounter()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    for target in binds:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
     finally:
-        db.close()
\ No newline at end of file
+        for target in binds:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
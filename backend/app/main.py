@@ -1,18 +1,53 @@
 # backend/app/main.py
-from fastapi import FastAPI, Depends
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Depends, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 from sqlalchemy.orm import Session
-from app.database import get_db, Base, engine
+from app.database import get_db, Base, engine, async_engine, SessionLocal
 from app.core.config import settings
-from app.api.v1.endpoints import users, auth, secrets
+from app.core.metrics import HashingPoolCollector, MetricsMiddleware, PoolCollector
+from app.core.query_stats import QueryStatsMiddleware, instrument_engine
+from app.core.security import hashing_pool
+from app.api.v1.endpoints import users, auth, secrets, attachments, admin
+from app.services.outbox import run_outbox_dispatcher
+from app.services.changes import run_change_pruner
+from app.services.events import get_broker
+from app.services.key_rotation import run_key_rotation_worker
+from app.services.visibility import get_visibility_index
 from sqlalchemy.sql import text 
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers with the app and stop them on shutdown"""
+    broker = get_broker()
+    await broker.start()
+    tasks = [
+        asyncio.create_task(run_change_pruner()),
+        asyncio.create_task(run_key_rotation_worker())
+    ]
+    if settings.EMAIL_OUTBOX_ENABLED:
+        tasks.append(asyncio.create_task(run_outbox_dispatcher()))
+    if settings.VISIBILITY_INDEX_ENABLED:
+        visibility_index = get_visibility_index()
+        broker.add_listener(visibility_index.apply_event)
+        tasks.append(asyncio.create_task(visibility_index.rebuild()))
+    yield
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    await broker.stop()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -24,6 +59,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    REGISTRY.register(PoolCollector({"sync": engine, "async": async_engine.sync_engine}))
+    REGISTRY.register(HashingPoolCollector(hashing_pool))
+
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+app.add_middleware(QueryStatsMiddleware)
+
 # Include routers
 app.include_router(
     users.router,
@@ -43,6 +87,18 @@ app.include_router(
     tags=["secrets"]
 )
 
+app.include_router(
+    attachments.router,
+    prefix=f"{settings.API_V1_STR}/secrets",
+    tags=["attachments"]
+)
+
+app.include_router(
+    admin.router,
+    prefix=f"{settings.API_V1_STR}/admin",
+    tags=["admin"]
+)
+
 
 
 @app.get("/health")
@@ -53,10 +109,13 @@ def health_check():
     }
 
 @app.get("/db-health")
-def database_health_check(db: Session = Depends(get_db)):
+def database_health_check():
+    # Not Depends(get_db): its connection checkout would fail before the
+    # error could be reported
     try:
-        result = db.execute(text("SELECT 1"))
-        result.scalar()  # Actually fetch the result
+        with SessionLocal() as db:
+            result = db.execute(text("SELECT 1"))
+            result.scalar()  # Actually fetch the result
         return {
             "status": "healthy",
             "database": "connected"
@@ -67,6 +126,13 @@ def database_health_check(db: Session = Depends(get_db)):
             "database": str(e)
         }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics of this worker process"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
 # Optional: Add example data for testing
 @app.post("/test/init-db", tags=["testing"])
 def initialize_test_data(db: Session = Depends(get_db)):
@@ -1,9 +1,9 @@
 # backend/app/models/core.py
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Text, LargeBinary, Boolean, ForeignKey, DateTime, Index, DDL, event, literal_column, or_, true
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
-from app.core.roles import RoleLevel
+from app.core.roles import RoleLevel, mask_role_levels, role_bit
 
 class User(Base):
     __tablename__ = "users"
@@ -33,13 +33,32 @@ class Role(Base):
     level = Column(Integer, nullable=False, unique=True)
     description = Column(String)
 
+# Full-text search configuration (no stemming: titles are names, not prose)
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+def search_document(title, description):
+    """
+    Weighted tsvector over a secret's title (A) and description (B). Queries
+    must use this exact expression for Postgres to use the GIN index on it.
+    """
+    return func.setweight(
+        func.to_tsvector(SEARCH_CONFIG, func.coalesce(title, literal_column("''"))),
+        literal_column("'A'")
+    ).op("||")(func.setweight(
+        func.to_tsvector(SEARCH_CONFIG, func.coalesce(description, literal_column("''"))),
+        literal_column("'B'")
+    ))
+
 class Secret(Base):
     __tablename__ = "secrets"
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(Text)
-    encrypted_data = Column(Text, nullable=False)
+    # Raw cipher envelope; encrypted_data holds the legacy base64 text form,
+    # still written by the previous release, and is cleared on every write
+    encrypted_blob = Column(LargeBinary, nullable=True)
+    encrypted_data = Column(Text, nullable=True)
     created_by_user_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -47,23 +66,92 @@ class Secret(Base):
     is_shared = Column(Boolean, default=False)
     share_with_all = Column(Boolean, default=False)
     min_role_level = Column(Integer, nullable=True)
+    # Bit L set when role level L can see the secret: share_with_all,
+    # min_role_level and role_shares folded into one column by share_secret
+    visible_roles_mask = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     creator = relationship("User", back_populates="secrets")
-    role_shares = relationship("SecretRoleShare", back_populates="secret", cascade="all, delete-orphan")
+    # Every secret response includes its role shares, so batch-load them with
+    # one extra SELECT per query instead of one lazy load per secret
+    role_shares = relationship(
+        "SecretRoleShare",
+        back_populates="secret",
+        cascade="all, delete-orphan",
+        lazy="selectin"
+    )
+
+    # Keyset pagination (ordered by id) over the user's own secrets; shared
+    # ones are found through visible_roles_mask
+    __table_args__ = (
+        Index("ix_secrets_created_by_user_id_id", "created_by_user_id", "id"),
+        # Full-text search; SQLite uses the secrets_fts table instead (below)
+        Index(
+            "ix_secrets_search",
+            search_document(title, description),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
 
     def can_access(self, user: User) -> bool:
         """Check if a user can access this secret"""
         # Owner and creator always have access
         if user.role_level == RoleLevel.OWNER or user.id == self.created_by_user_id:
             return True
-            
-        # If shared with all, check role hierarchy
-        if self.share_with_all and self.min_role_level:
-            return user.role_level >= self.min_role_level
-            
-        # Check role-based shares
-        return any(share.role_level <= user.role_level for share in self.role_shares)
+
+        # Shares (with all or per role) are folded into the visibility mask
+        return bool(self.visible_roles_mask & role_bit(user.role_level))
+
+    @property
+    def ciphertext(self):
+        """
+        Stored server-side ciphertext. A legacy encrypted_data wins: the
+        previous release may have updated it after the blob was backfilled.
+        """
+        return self.encrypted_data if self.encrypted_data is not None else self.encrypted_blob
+
+    def visible_role_levels(self) -> set:
+        """Role levels this secret is currently shared with"""
+        return mask_role_levels(self.visible_roles_mask or 0)
+
+    @classmethod
+    def shared_with_clause(cls, user: User):
+        """
+        SQL expression matching secrets shared with the user's role: a bit
+        test on the secret row itself, without joining secret_role_shares.
+        Mirrors can_access, without the owner/creator bypass.
+        """
+        return cls.visible_roles_mask.op("&")(role_bit(user.role_level)) != 0
+
+    @classmethod
+    def access_clause(cls, user: User):
+        """SQL expression matching every secret the user can access (see can_access)"""
+        if user.role_level == RoleLevel.OWNER:
+            return true()
+        return or_(cls.created_by_user_id == user.id, cls.shared_with_clause(user))
+
+# SQLite fallback for search: an FTS5 index over title and description,
+# kept in sync with the secrets table by triggers
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS secrets_fts USING fts5("
+    "title, description, content='secrets', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS secrets_fts_ai AFTER INSERT ON secrets BEGIN "
+    "INSERT INTO secrets_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS secrets_fts_ad AFTER DELETE ON secrets BEGIN "
+    "INSERT INTO secrets_fts(secrets_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS secrets_fts_au AFTER UPDATE OF title, description ON secrets BEGIN "
+    "INSERT INTO secrets_fts(secrets_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO secrets_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+]
+
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(Secret.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(Secret.__table__, "before_drop", DDL("DROP TABLE IF EXISTS secrets_fts").execute_if(dialect="sqlite"))
 
 class SecretRoleShare(Base):
     __tablename__ = "secret_role_shares"
@@ -76,4 +164,115 @@ class SecretRoleShare(Base):
 
     # Relationships
     secret = relationship("Secret", back_populates="role_shares")
-    created_by = relationship("User", foreign_keys=[created_by_user_id])
\ No newline at end of file
+    created_by = relationship("User", foreign_keys=[created_by_user_id])
+
+class SecretChange(Base):
+    """
+    Append-only log of secret changes; seq is the sync sequence number,
+    assigned in commit order when the writing transaction commits.
+    Rows outlive their secret, so deletes are kept as tombstones until pruned.
+    """
+    __tablename__ = "secret_changes"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    seq = Column(BigInteger, nullable=True, unique=True, index=True)
+    secret_id = Column(Integer, nullable=False, index=True)
+    change_type = Column(String, nullable=False)  # create / update / delete / share
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Who could see the secret around the change: its creator, and its
+    # visible_roles_mask before and after. NULL on records of secrets
+    # deleted before these were kept.
+    creator_id = Column(Integer, nullable=True)
+    previous_mask = Column(Integer, nullable=True)
+    mask = Column(Integer, nullable=True)
+
+    @classmethod
+    def seen_by_clause(cls, user: User):
+        """
+        SQL expression matching changes to secrets the user could see before
+        or after the change (see Secret.can_access). Records without a
+        creator are kept, as their audience is unknown.
+        """
+        if user.role_level == RoleLevel.OWNER:
+            return true()
+        return or_(
+            cls.creator_id.is_(None),
+            cls.creator_id == user.id,
+            cls.previous_mask.op("|")(cls.mask).op("&")(role_bit(user.role_level)) != 0
+        )
+
+class SecretAttachment(Base):
+    """A file attached to a secret, stored as independently encrypted chunks"""
+    __tablename__ = "secret_attachments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    secret_id = Column(Integer, ForeignKey("secrets.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False, default=0)
+    chunk_size = Column(Integer, nullable=False)
+    chunk_count = Column(Integer, nullable=False, default=0)
+    content_tag = Column(String, nullable=True)  # HMAC of the plaintext, see attachment_tagger
+    created_by_user_id = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class SecretAttachmentChunk(Base):
+    """One encrypted chunk; the envelope is bound to its attachment and index"""
+    __tablename__ = "secret_attachment_chunks"
+
+    attachment_id = Column(
+        Integer,
+        ForeignKey("secret_attachments.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    chunk_index = Column(Integer, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+
+class KeyRotationJob(Base):
+    """
+    Progress of a background re-encryption of secrets, then attachment
+    chunks, with the current key
+    """
+    __tablename__ = "key_rotation_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, nullable=False, default="running")  # running, completed, failed
+    key_id = Column(String, nullable=True)  # Hex id of the target key (AES-GCM only)
+    last_secret_id = Column(Integer, nullable=False, default=0)  # Checkpoint of the current pass
+    # Checkpoint of the current pass over secret_attachment_chunks (its primary key)
+    last_chunk_attachment_id = Column(Integer, nullable=False, default=0)
+    last_chunk_index = Column(Integer, nullable=False, default=0)
+    passes = Column(Integer, nullable=False, default=1)
+    rotated_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)  # Secrets and chunks needing rotation at start
+    last_error = Column(Text, nullable=True)
+    created_by_user_id = Column(Integer, ForeignKey("users.id"))
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class VersionCounter(Base):
+    """Per-scope change counters backing ETags of listing endpoints"""
+    __tablename__ = "version_counters"
+
+    scope = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
+
+class EmailOutbox(Base):
+    """Outgoing email, written in the same transaction as the change that triggers it"""
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    recipient = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON template data
+    status = Column(String, nullable=False, default="pending")  # pending / sent / failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
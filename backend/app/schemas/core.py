@@ -19,6 +19,15 @@ class SecretUpdate(BaseModel):
     client_encrypted_data: Optional[str] = None
     is_password: Optional[bool] = None
 
+class SecretImportError(BaseModel):
+    index: int
+    error: str
+
+class SecretImportResponse(BaseModel):
+    imported: int
+    ids: List[int]
+    errors: List[SecretImportError] = []
+
 class SecretRoleShare(BaseModel):
     role_level: int
 
@@ -40,11 +49,10 @@ class SecretRoleShareResponse(BaseModel):
     class Config:
         from_attributes = True
 
-class SecretResponse(BaseModel):
+class SecretSummaryResponse(BaseModel):
     id: int
     title: str
     description: Optional[str] = None
-    client_encrypted_data: str
     created_by_user_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -57,6 +65,55 @@ class SecretResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class SecretResponse(SecretSummaryResponse):
+    client_encrypted_data: str
+
+class SecretBatchRequest(BaseModel):
+    ids: List[int]
+
+class SecretBatchResponse(BaseModel):
+    found: List[SecretResponse] = []
+    forbidden: List[int] = []
+    missing: List[int] = []
+
+class SecretChangesResponse(BaseModel):
+    changes: List[SecretResponse] = []  # Created or updated and visible to the caller
+    removed: List[int] = []  # Deleted, or no longer visible to the caller
+    next_since: int
+    has_more: bool = False
+    reset_required: bool = False  # `since` is older than the retained history
+
+class SecretAttachmentResponse(BaseModel):
+    id: int
+    secret_id: int
+    filename: str
+    content_type: str
+    size: int
+    content_tag: Optional[str] = None
+    created_by_user_id: int
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class KeyRotationJobResponse(BaseModel):
+    id: int
+    status: str
+    key_id: Optional[str] = None
+    last_secret_id: int
+    last_chunk_attachment_id: int
+    last_chunk_index: int
+    passes: int
+    rotated_count: int
+    total_count: int
+    last_error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 # Base User Schema
 class UserBase(BaseModel):
     email: EmailStr
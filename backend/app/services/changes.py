@@ -0,0 +1,114 @@
+# backend/app/services/changes.py
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.core import SecretChange, VersionCounter
+from app.services.versions import CHANGE_LOG_SCOPE, _bump_statement
+
+logger = logging.getLogger(__name__)
+
+CHANGE_CREATE = "create"
+CHANGE_UPDATE = "update"
+CHANGE_DELETE = "delete"
+CHANGE_SHARE = "share"
+
+_PENDING_CHANGES_KEY = "pending_secret_changes"
+
+def record_secret_change(
+    db: AsyncSession,
+    secret_id: int,
+    change_type: str,
+    creator_id: int,
+    previous_mask: int,
+    mask: int
+) -> None:
+    """
+    Log a change in the caller's transaction, so it commits with the change
+    itself. The masks are the secret's visible_roles_mask before and after.
+    """
+    db.add(SecretChange(
+        secret_id=secret_id,
+        change_type=change_type,
+        creator_id=creator_id,
+        previous_mask=previous_mask or 0,
+        mask=mask or 0
+    ))
+    db.info[_PENDING_CHANGES_KEY] = True
+
+async def record_secret_changes(
+    db: AsyncSession,
+    secret_ids: Iterable[int],
+    change_type: str,
+    creator_id: int
+) -> None:
+    """Log the same change to many unshared secrets with a single INSERT"""
+    rows = [
+        dict(secret_id=secret_id, change_type=change_type, creator_id=creator_id, previous_mask=0, mask=0)
+        for secret_id in secret_ids
+    ]
+    if rows:
+        await db.execute(insert(SecretChange), rows)
+        db.info[_PENDING_CHANGES_KEY] = True
+
+@event.listens_for(Session, "before_commit")
+def _sequence_secret_changes(session: Session) -> None:
+    """
+    Number the transaction's change records in commit order. Ids come from
+    the table's sequence at insert time, so a long transaction (an import)
+    can commit ids below ones a client already synced past. Instead, the
+    counter row is locked right before the commit: a concurrent writer waits
+    there until this transaction has committed, so a later seq is never
+    visible before an earlier one. Writers serialize only for their commit.
+    """
+    if not session.info.pop(_PENDING_CHANGES_KEY, False):
+        return
+    session.flush()
+    first_id, last_id = session.execute(
+        select(func.min(SecretChange.id), func.max(SecretChange.id)).where(SecretChange.seq.is_(None))
+    ).one()
+    if first_id is None:
+        return
+    # Seqs keep the id order within the transaction; other transactions' ids
+    # interleaved in the range just leave gaps
+    top = session.execute(
+        _bump_statement(session.get_bind().dialect.name, [CHANGE_LOG_SCOPE], amount=last_id - first_id + 1)
+        .returning(VersionCounter.version)
+    ).scalar_one()
+    session.execute(
+        update(SecretChange)
+        .where(SecretChange.seq.is_(None), SecretChange.id.between(first_id, last_id))
+        .values(seq=SecretChange.id + (top - last_id))
+    )
+
+async def prune_secret_changes(db: AsyncSession) -> int:
+    """
+    Delete change records older than the retention window. The newest record
+    is always kept, so clients can tell their cursor fell behind the history.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.SECRET_CHANGE_RETENTION_DAYS)
+    newest = (await db.execute(select(func.max(SecretChange.seq)))).scalar()
+    if newest is None:
+        return 0
+    result = await db.execute(
+        delete(SecretChange).where(SecretChange.changed_at < cutoff, SecretChange.seq < newest)
+    )
+    await db.commit()
+    return result.rowcount
+
+async def run_change_pruner() -> None:
+    """Background task enforcing SECRET_CHANGE_RETENTION_DAYS"""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                pruned = await prune_secret_changes(db)
+            if pruned:
+                logger.info("Pruned %s secret change records", pruned)
+        except Exception:
+            logger.exception("Pruning secret changes failed")
+        await asyncio.sleep(settings.SECRET_CHANGE_PRUNE_INTERVAL_SECONDS)
@@ -4,6 +4,7 @@ from sendgrid.helpers.mail import Mail, Email, To, Content, TemplateId
 from app.core.config import settings
 from pydantic import EmailStr
 from typing import Dict, Any
+import asyncio
 import json
 
 class EmailService:
@@ -11,6 +12,27 @@ class EmailService:
         self.client = SendGridAPIClient(settings.SENDGRID_API_KEY)
         self.from_email = Email(settings.SENDGRID_FROM_EMAIL)
 
+    def send_template(self, email_to: EmailStr, template_data: Dict[str, Any]) -> None:
+        """
+        Send the invitation template using SendGrid (blocking)
+        """
+        message = Mail(
+            from_email=self.from_email,
+            to_emails=To(email_to),
+        )
+        
+        # Set SendGrid template ID
+        message.template_id = TemplateId(settings.SENDGRID_INVITATION_TEMPLATE_ID)
+        message.dynamic_template_data = template_data
+
+        try:
+            response = self.client.send(message)
+            if response.status_code not in (200, 201, 202):
+                raise Exception(f"SendGrid API returned status code {response.status_code}")
+        except Exception as e:
+            print(f"Failed to send invitation email: {str(e)}")
+            raise Exception("Failed to send invitation email")
+
     async def send_invitation_email(
         self,
         email_to: EmailStr,
@@ -32,22 +54,8 @@ class EmailService:
             "expires_in_hours": 48
         }
 
-        message = Mail(
-            from_email=self.from_email,
-            to_emails=To(email_to),
-        )
-        
-        # Set SendGrid template ID
-        message.template_id = TemplateId(settings.SENDGRID_INVITATION_TEMPLATE_ID)
-        message.dynamic_template_data = template_data
-
-        try:
-            response = self.client.send(message)
-            if response.status_code not in (200, 201, 202):
-                raise Exception(f"SendGrid API returned status code {response.status_code}")
-        except Exception as e:
-            print(f"Failed to send invitation email: {str(e)}")
-            raise Exception("Failed to send invitation email")
+        # The SendGrid client is blocking, keep it off the event loop
+        await asyncio.to_thread(self.send_template, email_to, template_data)
 
 # Create a global instance
 email_service = EmailService()
\ No newline at end of file
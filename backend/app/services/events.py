@@ -0,0 +1,194 @@
+# backend/app/services/events.py
+import asyncio
+import json
+import logging
+from functools import lru_cache
+from typing import Callable, List, Optional, Set
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.roles import RoleLevel
+from app.database import async_engine
+from app.services.versions import role_scope, vault_scope
+
+logger = logging.getLogger(__name__)
+
+# Sent to subscribers that may have missed events (queue overflow, lost
+# LISTEN connection); clients resync through /secrets/changes
+RESET_EVENT = {"type": "reset"}
+
+_PENDING_EVENTS_KEY = "pending_secret_events"
+
+class Subscription:
+    """A connected client's event queue, filtered by what the user can see"""
+    def __init__(self, user_id: int, role_level: int):
+        self.user_id = user_id
+        self.role_level = role_level
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENT_QUEUE_SIZE)
+
+    def wants(self, secret_event: dict) -> bool:
+        """
+        Events carry the version scopes of the change (see services.versions),
+        i.e. the creator's vault and every role level that gained or lost access
+        """
+        if "scopes" not in secret_event or self.role_level == RoleLevel.OWNER:
+            return True
+        scopes = secret_event["scopes"]
+        return vault_scope(self.user_id) in scopes or role_scope(self.role_level) in scopes
+
+    def put(self, secret_event: dict) -> None:
+        try:
+            self.queue.put_nowait(secret_event)
+        except asyncio.QueueFull:
+            # A slow client resyncs instead of replaying its backlog
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET_EVENT)
+
+class InProcessBroker:
+    """
+    Fans events out to this process's subscribers once the publishing
+    transaction commits. Enough for a single worker and for local testing.
+    """
+    def __init__(self):
+        self._subscriptions: Set[Subscription] = set()
+        self._listeners: List[Callable[[dict], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        self._subscriptions.clear()
+
+    def subscribe(self, user_id: int, role_level: int) -> Subscription:
+        subscription = Subscription(user_id, role_level)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def add_listener(self, listener: Callable[[dict], None]) -> None:
+        """Register an in-process consumer of every event, unfiltered"""
+        self._listeners.append(listener)
+
+    def dispatch(self, secret_event: dict) -> None:
+        """Deliver an event to listeners and matching subscribers (event loop thread only)"""
+        for listener in self._listeners:
+            try:
+                listener(secret_event)
+            except Exception:
+                logger.exception("Event listener failed")
+        for subscription in list(self._subscriptions):
+            if subscription.wants(secret_event):
+                subscription.put(secret_event)
+
+    def dispatch_threadsafe(self, secret_event: dict) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.dispatch, secret_event)
+
+    async def publish(self, db: AsyncSession, secret_event: dict) -> None:
+        """Queue an event on the session; it is dispatched after commit"""
+        db.info.setdefault(_PENDING_EVENTS_KEY, []).append(secret_event)
+
+class PostgresBroker(InProcessBroker):
+    """
+    Publishes with pg_notify inside the write transaction, so Postgres only
+    delivers events of committed changes. Each worker holds one LISTEN
+    connection and fans the notifications out to its own subscribers.
+    """
+    def __init__(self):
+        super().__init__()
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await super().start()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        await super().stop()
+
+    async def publish(self, db: AsyncSession, secret_event: dict) -> None:
+        await db.execute(select(func.pg_notify(settings.EVENT_CHANNEL, json.dumps(secret_event))))
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        try:
+            self.dispatch(json.loads(payload))
+        except ValueError:
+            logger.warning("Ignoring malformed notification on %s", channel)
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        dsn = make_url(settings.SQLALCHEMY_ASYNC_DATABASE_URI).set(drivername="postgresql")
+        dsn = dsn.render_as_string(hide_password=False)
+        while True:
+            try:
+                connection = await asyncpg.connect(dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                try:
+                    await connection.add_listener(settings.EVENT_CHANNEL, self._on_notification)
+                    # Whatever happened while we were not listening is lost
+                    self.dispatch(RESET_EVENT)
+                    await closed.wait()
+                finally:
+                    await connection.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Event listener connection failed")
+            await asyncio.sleep(5)
+
+BROKERS = {
+    "memory": InProcessBroker,
+    "postgres": PostgresBroker,
+}
+
+@lru_cache
+def get_broker() -> InProcessBroker:
+    """Create the broker configured by EVENT_BROKER (Postgres when the database is)"""
+    name = settings.EVENT_BROKER
+    if name is None:
+        name = "postgres" if async_engine.dialect.name == "postgresql" else "memory"
+    if name not in BROKERS:
+        raise ValueError(f"Unknown event broker: {name}")
+    return BROKERS[name]()
+
+async def publish_secret_event(
+    db: AsyncSession,
+    change_type: str,
+    scopes: List[str],
+    secret_id: Optional[int] = None,
+    count: Optional[int] = None,
+    creator_id: Optional[int] = None,
+    mask: Optional[int] = None
+) -> None:
+    """
+    Publish a secret change in the caller's transaction. creator_id and mask
+    (the secret's state after the change) feed in-process listeners such as
+    the visibility index; they are not sent to clients.
+    """
+    secret_event = {"type": change_type, "scopes": sorted(set(scopes))}
+    for key, value in (("secret_id", secret_id), ("count", count), ("creator_id", creator_id), ("mask", mask)):
+        if value is not None:
+            secret_event[key] = value
+    await get_broker().publish(db, secret_event)
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_pending_events(session: Session) -> None:
+    for secret_event in session.info.pop(_PENDING_EVENTS_KEY, []):
+        get_broker().dispatch_threadsafe(secret_event)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session) -> None:
+    session.info.pop(_PENDING_EVENTS_KEY, None)
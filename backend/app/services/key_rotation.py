@@ -0,0 +1,220 @@
+# backend/app/services/key_rotation.py
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.encryption import (
+    current_chunk_prefix,
+    current_envelope_prefix,
+    decrypt_many_async,
+    encrypt_many_raw_async,
+    reencrypt_chunks_async
+)
+from app.database import AsyncSessionLocal
+from app.models.core import KeyRotationJob, Secret, SecretAttachment, SecretAttachmentChunk
+
+logger = logging.getLogger(__name__)
+
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+def needs_rotation_clause():
+    """
+    SQL expression matching secrets not yet encrypted with the current key:
+    rows still holding legacy text, and blobs whose envelope header names
+    another key or engine. Fernet tokens carry no key id, so with the Fernet
+    engine every non-empty blob is rewritten.
+    """
+    prefix = current_envelope_prefix()
+    stale_blob = func.length(Secret.encrypted_blob) > 0
+    if prefix is not None:
+        stale_blob = and_(stale_blob, func.substr(Secret.encrypted_blob, 1, len(prefix)) != prefix)
+    return or_(Secret.encrypted_data.isnot(None), Secret.encrypted_blob.is_(None), stale_blob)
+
+def chunk_needs_rotation_clause():
+    """SQL expression matching attachment chunks whose envelope names another key"""
+    prefix = current_chunk_prefix()
+    return func.substr(SecretAttachmentChunk.data, 1, len(prefix)) != prefix
+
+async def _count_stale(db: AsyncSession) -> int:
+    secrets = (await db.execute(
+        select(func.count()).select_from(Secret).where(needs_rotation_clause())
+    )).scalar()
+    chunks = (await db.execute(
+        select(func.count()).select_from(SecretAttachmentChunk).where(chunk_needs_rotation_clause())
+    )).scalar()
+    return secrets + chunks
+
+async def start_rotation(db: AsyncSession, user_id: int) -> KeyRotationJob:
+    """Create a job re-encrypting every stale secret and chunk; the worker picks it up"""
+    prefix = current_envelope_prefix()
+    total = await _count_stale(db)
+    job = KeyRotationJob(
+        status=JOB_RUNNING,
+        key_id=prefix[1:].hex() if prefix else None,
+        last_secret_id=0,
+        last_chunk_attachment_id=0,
+        last_chunk_index=0,
+        passes=1,
+        rotated_count=0,
+        total_count=total,
+        created_by_user_id=user_id
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+async def _rotate_secrets(db: AsyncSession, job: KeyRotationJob) -> bool:
+    """Re-encrypt the secrets after the job's checkpoint; False once past the last"""
+    # Rows locked by a foreground write are skipped and caught by a later pass
+    rows = (await db.execute(
+        select(Secret.id, Secret.encrypted_blob, Secret.encrypted_data, Secret.updated_at)
+        .where(Secret.id > job.last_secret_id, needs_rotation_clause())
+        .order_by(Secret.id)
+        .limit(settings.KEY_ROTATION_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )).all()
+    if not rows:
+        return False
+
+    plaintexts = await decrypt_many_async([
+        row.encrypted_data if row.encrypted_data is not None else row.encrypted_blob
+        for row in rows
+    ])
+    ciphertexts = await encrypt_many_raw_async(plaintexts)
+    # Keep updated_at: the secret's content did not change
+    await db.execute(update(Secret), [
+        dict(id=row.id, encrypted_blob=ciphertext, encrypted_data=None, updated_at=row.updated_at)
+        for row, ciphertext in zip(rows, ciphertexts)
+    ])
+    job.last_secret_id = rows[-1].id
+    job.rotated_count += len(rows)
+    return True
+
+async def _rotate_chunks(db: AsyncSession, job: KeyRotationJob) -> bool:
+    """Re-encrypt the attachment chunks after the job's checkpoint; False once past the last"""
+    Chunk = SecretAttachmentChunk
+    rows = (await db.execute(
+        select(Chunk.attachment_id, Chunk.chunk_index, Chunk.data, SecretAttachment.chunk_count)
+        .join(SecretAttachment, SecretAttachment.id == Chunk.attachment_id)
+        .where(
+            or_(
+                Chunk.attachment_id > job.last_chunk_attachment_id,
+                and_(
+                    Chunk.attachment_id == job.last_chunk_attachment_id,
+                    Chunk.chunk_index > job.last_chunk_index
+                )
+            ),
+            chunk_needs_rotation_clause()
+        )
+        .order_by(Chunk.attachment_id, Chunk.chunk_index)
+        .limit(settings.KEY_ROTATION_CHUNK_BATCH_SIZE)
+        .with_for_update(of=Chunk, skip_locked=True)
+    )).all()
+    if not rows:
+        return False
+
+    # A chunk's envelope is bound to its attachment, index and being the
+    # last one, so it is re-sealed in place with the same associated data
+    envelopes = await reencrypt_chunks_async([
+        (row.data, row.attachment_id, row.chunk_index, row.chunk_index == row.chunk_count - 1)
+        for row in rows
+    ])
+    await db.execute(update(Chunk), [
+        dict(attachment_id=row.attachment_id, chunk_index=row.chunk_index, data=envelope)
+        for row, envelope in zip(rows, envelopes)
+    ])
+    job.last_chunk_attachment_id = rows[-1].attachment_id
+    job.last_chunk_index = rows[-1].chunk_index
+    job.rotated_count += len(rows)
+    return True
+
+async def rotate_batch(db: AsyncSession, job_id: int) -> Optional[bool]:
+    """
+    Re-encrypt the next batch of a job and checkpoint it in one transaction.
+    Each pass goes through the secrets, then the attachment chunks, in id
+    order. Returns True if there is more work, False once the job is done,
+    or None if another worker holds the job.
+    """
+    job = (await db.execute(
+        select(KeyRotationJob)
+        .where(KeyRotationJob.id == job_id, KeyRotationJob.status == JOB_RUNNING)
+        .with_for_update(skip_locked=True)
+    )).scalar_one_or_none()
+    if job is None:
+        return None
+
+    if await _rotate_secrets(db, job) or await _rotate_chunks(db, job):
+        await db.commit()
+        return True
+
+    # End of a pass. Rows skipped while locked are still stale, so they get
+    # another pass; with Fernet staleness of secrets is unknowable and one
+    # pass over them is it. Chunks are always AES-GCM.
+    stale_secrets = 0
+    if current_envelope_prefix() is not None:
+        stale_secrets = (await db.execute(
+            select(func.count()).select_from(Secret).where(needs_rotation_clause())
+        )).scalar()
+    stale_chunks = (await db.execute(
+        select(func.count()).select_from(SecretAttachmentChunk).where(chunk_needs_rotation_clause())
+    )).scalar()
+    if stale_secrets or stale_chunks:
+        if (stale_secrets and job.last_secret_id > 0) or job.last_chunk_attachment_id > 0:
+            job.passes += 1
+        if stale_secrets:
+            job.last_secret_id = 0
+        job.last_chunk_attachment_id = 0
+        job.last_chunk_index = 0
+        await db.commit()
+        return True
+
+    job.status = JOB_COMPLETED
+    job.finished_at = datetime.now(timezone.utc)
+    await db.commit()
+    return False
+
+async def _run_job(job_id: int) -> None:
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                more = await rotate_batch(db, job_id)
+        except Exception as e:
+            logger.exception("Key rotation job %s failed", job_id)
+            async with AsyncSessionLocal() as db:
+                job = await db.get(KeyRotationJob, job_id)
+                job.status = JOB_FAILED
+                job.last_error = str(e)
+                job.finished_at = datetime.now(timezone.utc)
+                await db.commit()
+            return
+        if not more:
+            # Done, or another worker holds the job
+            return
+        # Throttle, so rotation never competes hard with foreground traffic
+        await asyncio.sleep(settings.KEY_ROTATION_BATCH_DELAY_SECONDS)
+
+async def run_key_rotation_worker() -> None:
+    """
+    Background task resuming running rotation jobs from their checkpoint,
+    including after a restart
+    """
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                job_id = (await db.execute(
+                    select(KeyRotationJob.id)
+                    .where(KeyRotationJob.status == JOB_RUNNING)
+                    .order_by(KeyRotationJob.id)
+                    .limit(1)
+                )).scalar()
+            if job_id is not None:
+                await _run_job(job_id)
+        except Exception:
+            logger.exception("Key rotation worker failed")
+        await asyncio.sleep(settings.KEY_ROTATION_POLL_SECONDS)
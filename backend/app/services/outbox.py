@@ -0,0 +1,199 @@
+# backend/app/services/outbox.py
+import asyncio
+import json
+import logging
+import smtplib
+import textwrap
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.core import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+INVITATION_EMAIL = "invitation"
+
+def enqueue_invitation_email(
+    db: Session,
+    email_to: str,
+    user_name: str,
+    role_name: str,
+    invitation_token: str
+) -> EmailOutbox:
+    """
+    Queue an invitation email in the caller's transaction; it is only sent
+    once that transaction commits
+    """
+    message = EmailOutbox(
+        kind=INVITATION_EMAIL,
+        recipient=email_to,
+        payload=json.dumps({
+            "user_name": user_name,
+            "role_name": role_name,
+            "invitation_token": invitation_token,
+        }),
+    )
+    db.add(message)
+    return message
+
+def render_invitation_email(payload: dict) -> dict:
+    """Build the subject, body and template data of an invitation email"""
+    invitation_link = f"{settings.FRONTEND_URL}/accept-invite/{payload['invitation_token']}"
+    return {
+        "subject": f"Invitation to Join Password Manager - {payload['role_name']} Role",
+        # Plain text; the template is indented with the code
+        "body": textwrap.dedent(f"""
+        Hello {payload['user_name']},
+
+        You have been invited to join the Password Manager system as a {payload['role_name']}.
+
+        Click the following link to accept the invitation and set up your account:
+        {invitation_link}
+
+        This invitation will expire in 48 hours.
+
+        Best regards,
+        Password Manager Team
+        """).strip(),
+        "template_data": {
+            "user_name": payload["user_name"],
+            "role_name": payload["role_name"],
+            "invitation_link": invitation_link,
+            "company_name": settings.COMPANY_NAME,
+            "expires_in_hours": 48
+        },
+    }
+
+class ConsoleTransport:
+    """Logs messages instead of sending them (development default)"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def send(self, recipient: str, message: dict) -> None:
+        logger.info("Email to %s: %s", recipient, message["subject"])
+
+class SMTPTransport:
+    """Sends a whole batch over a single SMTP connection"""
+    def __init__(self):
+        self._smtp: Optional[smtplib.SMTP] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except smtplib.SMTPException:
+                pass
+            self._smtp = None
+        return False
+
+    def _connect(self) -> smtplib.SMTP:
+        if settings.SMTP_USE_TLS:
+            smtp = smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT, timeout=30)
+        else:
+            smtp = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=30)
+        if settings.SMTP_USER:
+            smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD or "")
+        return smtp
+
+    def send(self, recipient: str, message: dict) -> None:
+        email = EmailMessage()
+        email["From"] = settings.SMTP_FROM
+        email["To"] = recipient
+        email["Subject"] = message["subject"]
+        email.set_content(message["body"])
+
+        if self._smtp is None:
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(email)
+        except smtplib.SMTPServerDisconnected:
+            # Reconnect once if the server dropped the idle connection
+            self._smtp = self._connect()
+            self._smtp.send_message(email)
+
+class SendGridTransport:
+    """Sends through the shared SendGrid client"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def send(self, recipient: str, message: dict) -> None:
+        from app.services.email import email_service
+        email_service.send_template(recipient, message["template_data"])
+
+TRANSPORTS = {
+    "console": ConsoleTransport,
+    "smtp": SMTPTransport,
+    "sendgrid": SendGridTransport,
+}
+
+def get_transport():
+    """Create the transport configured by EMAIL_TRANSPORT"""
+    if settings.EMAIL_TRANSPORT not in TRANSPORTS:
+        raise ValueError(f"Unknown email transport: {settings.EMAIL_TRANSPORT}")
+    return TRANSPORTS[settings.EMAIL_TRANSPORT]()
+
+def dispatch_pending(db: Session, transport=None) -> int:
+    """
+    Send one batch of due outbox messages, scheduling failures for a retry
+    with exponential backoff. Returns the number of messages processed.
+    """
+    messages: List[EmailOutbox] = db.execute(
+        select(EmailOutbox)
+        .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= func.now())
+        .order_by(EmailOutbox.id)
+        .limit(settings.EMAIL_OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not messages:
+        return 0
+
+    with (transport or get_transport()) as active_transport:
+        for message in messages:
+            message.attempts += 1
+            try:
+                active_transport.send(message.recipient, render_invitation_email(json.loads(message.payload)))
+            except Exception as e:
+                logger.warning("Failed to send email %s: %s", message.id, e)
+                message.last_error = str(e)
+                if message.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                    message.status = "failed"
+                else:
+                    delay = settings.EMAIL_OUTBOX_BACKOFF_SECONDS * 2 ** (message.attempts - 1)
+                    message.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            else:
+                message.status = "sent"
+                message.sent_at = datetime.now(timezone.utc)
+                message.last_error = None
+
+    db.commit()
+    return len(messages)
+
+def _dispatch_until_empty() -> None:
+    db = SessionLocal()
+    try:
+        while dispatch_pending(db) == settings.EMAIL_OUTBOX_BATCH_SIZE:
+            pass
+    finally:
+        db.close()
+
+async def run_outbox_dispatcher() -> None:
+    """Background task polling the outbox; sending runs in a worker thread"""
+    while True:
+        try:
+            await asyncio.to_thread(_dispatch_until_empty)
+        except Exception:
+            logger.exception("Email outbox dispatch failed")
+        await asyncio.sleep(settings.EMAIL_OUTBOX_POLL_SECONDS)
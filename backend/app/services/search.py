@@ -0,0 +1,39 @@
+# backend/app/services/search.py
+import re
+from typing import List
+from sqlalchemy import Integer, column, func, literal_column, select, table
+from sqlalchemy.sql import Select
+from app.models.core import SEARCH_CONFIG, Secret, User, search_document
+
+MAX_SEARCH_TERMS = 8
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# The SQLite FTS5 table maintained by the triggers in models.core
+_secrets_fts = table("secrets_fts", column("rowid", Integer))
+
+def search_terms(q: str) -> List[str]:
+    """Split a query into lowercase word terms (punctuation is dropped)"""
+    return [term.lower() for term in _TERM_PATTERN.findall(q)][:MAX_SEARCH_TERMS]
+
+def search_query(dialect_name: str, user: User, terms: List[str]) -> Select:
+    """
+    Secrets visible to the user whose title or description contain words
+    starting with every term, best matches first (title matches weigh more)
+    """
+    query = select(Secret).where(Secret.access_clause(user))
+
+    if dialect_name == "postgresql":
+        document = search_document(Secret.title, Secret.description)
+        ts_query = func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms))
+        return (
+            query.where(document.op("@@")(ts_query))
+            .order_by(func.ts_rank(document, ts_query).desc(), Secret.id)
+        )
+
+    fts = literal_column("secrets_fts")
+    return (
+        query.join(_secrets_fts, _secrets_fts.c.rowid == Secret.id)
+        .where(fts.op("MATCH")(" ".join(f'"{term}"*' for term in terms)))
+        .order_by(func.bm25(fts, 10.0, 1.0), Secret.id)
+    )
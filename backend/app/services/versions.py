@@ -0,0 +1,91 @@
+# backend/app/services/versions.py
+import hashlib
+from typing import Dict, Iterable, List, Optional
+from fastapi import Request
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.roles import RoleLevel
+from app.models.core import VersionCounter
+
+# Scopes:
+#   vault:<user_id>  secrets created by the user
+#   role:<level>     secrets shared with a role level
+#   team:<level>     active users visible to a role level
+#   changes          the change log sequence (see services.changes)
+# Writers bump every scope whose readers could see the change; readers
+# combine their scopes into an ETag without touching the data tables.
+
+CHANGE_LOG_SCOPE = "changes"
+
+def vault_scope(user_id: int) -> str:
+    return f"vault:{user_id}"
+
+def role_scope(level: int) -> str:
+    return f"role:{level}"
+
+def team_scope(level: int) -> str:
+    return f"team:{level}"
+
+def secret_scopes(creator_id: int, role_levels: Iterable[int]) -> List[str]:
+    """Scopes affected by a change to a secret visible to the given role levels"""
+    return [vault_scope(creator_id)] + [role_scope(level) for level in sorted(set(role_levels))]
+
+def team_scopes(user_role_level: int) -> List[str]:
+    """Scopes affected by a change to a user: every level that can list them"""
+    return [team_scope(level) for level in RoleLevel if level >= user_role_level]
+
+def _bump_statement(dialect_name: str, scopes: List[str], amount: int = 1):
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = insert(VersionCounter).values([{"scope": scope, "version": amount} for scope in scopes])
+    return statement.on_conflict_do_update(
+        index_elements=[VersionCounter.scope],
+        set_={"version": VersionCounter.version + amount}
+    )
+
+async def bump_versions(db: AsyncSession, scopes: Iterable[str]) -> None:
+    """Bump scope counters in the caller's transaction"""
+    scopes = sorted(set(scopes))  # Fixed order avoids lock-order deadlocks
+    if scopes:
+        await db.execute(_bump_statement(db.bind.dialect.name, scopes))
+
+def bump_versions_sync(db: Session, scopes: Iterable[str]) -> None:
+    """Bump scope counters in the caller's transaction (sync session)"""
+    scopes = sorted(set(scopes))
+    if scopes:
+        db.execute(_bump_statement(db.get_bind().dialect.name, scopes))
+
+def _versions_query(scopes: List[str]):
+    return select(VersionCounter.scope, VersionCounter.version).where(VersionCounter.scope.in_(scopes))
+
+def make_etag(request: Request, user_id: int, role_level: int, versions: Dict[str, int]) -> str:
+    """Weak ETag over the caller, the query string and the scope versions"""
+    parts = [request.url.path, request.url.query, str(user_id), str(role_level)]
+    parts += [f"{scope}={version}" for scope, version in sorted(versions.items())]
+    return 'W/"' + hashlib.sha256("|".join(parts).encode()).hexdigest()[:32] + '"'
+
+async def read_versions(db: AsyncSession, scopes: List[str], include_global: bool = False) -> Dict[str, int]:
+    """
+    Current versions of the scopes (missing scopes are 0). include_global adds
+    the change log counter, for views over every secret (the owner's); it
+    moves on every secret write, in commit order.
+    """
+    if include_global:
+        scopes = scopes + [CHANGE_LOG_SCOPE]
+    versions = {scope: 0 for scope in scopes}
+    versions.update((await db.execute(_versions_query(scopes))).all())
+    return versions
+
+def read_versions_sync(db: Session, scopes: List[str]) -> Dict[str, int]:
+    """Current versions of the scopes (sync session)"""
+    versions = {scope: 0 for scope in scopes}
+    versions.update(db.execute(_versions_query(scopes)).all())
+    return versions
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already matches the ETag"""
+    if_none_match: Optional[str] = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return any(tag.strip() in (etag, "*") for tag in if_none_match.split(","))
@@ -0,0 +1,224 @@
+# backend/app/services/visibility.py
+import asyncio
+import heapq
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.roles import RoleLevel, role_bit
+from app.database import AsyncSessionLocal
+from app.models.core import Secret, User
+from app.services.changes import CHANGE_DELETE
+
+logger = logging.getLogger(__name__)
+
+def _ids() -> array:
+    return array("q")
+
+def _insert(ids: array, secret_id: int) -> None:
+    position = bisect_left(ids, secret_id)
+    if position == len(ids) or ids[position] != secret_id:
+        ids.insert(position, secret_id)
+
+def _remove(ids: array, secret_id: int) -> None:
+    position = bisect_left(ids, secret_id)
+    if position < len(ids) and ids[position] == secret_id:
+        ids.pop(position)
+
+def _ids_after(ids: array, after_id: int) -> Iterator[int]:
+    return (ids[position] for position in range(bisect_right(ids, after_id), len(ids)))
+
+class VisibilityIndex:
+    """
+    In-process map from creator and role level to the sorted ids of the
+    secrets they can see, held in compact int64 arrays. Kept current from
+    secret change events and rebuilt from the database on startup (and
+    whenever events may have been missed). Listings use it to pick a page of
+    ids; rows are still fetched by primary key and checked with can_access.
+    """
+    def __init__(self):
+        self.ready = False
+        self._rebuilding = False
+        self._rebuild_again = False
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._pending: List[dict] = []
+        self._set_state(_ids(), _ids(), array("H"), {}, {})
+
+    def _set_state(
+        self,
+        ids: array,
+        creators: array,
+        masks: array,
+        by_creator: Dict[int, array],
+        by_role: Dict[int, array]
+    ) -> None:
+        # ids is sorted; creators and masks are aligned with it
+        self._ids = ids
+        self._creators = creators
+        self._masks = masks
+        self._by_creator = by_creator
+        self._by_role = by_role
+
+    async def rebuild(self) -> None:
+        """Reload the index from the database; events arriving meanwhile are replayed"""
+        if self._rebuilding:
+            self._rebuild_again = True
+            return
+        self._rebuilding = True
+        try:
+            while True:
+                self._rebuild_again = False
+                self._pending = []
+                await self._load()
+                pending, self._pending = self._pending, []
+                self._rebuilding = False
+                for secret_event in pending:
+                    self.apply_event(secret_event)
+                if not self._rebuild_again:
+                    break
+                self._rebuilding = True
+            self.ready = True
+        except Exception:
+            logger.exception("Rebuilding the visibility index failed")
+            self.ready = False
+        finally:
+            self._rebuilding = False
+
+    async def _load(self) -> None:
+        ids, creators, masks = _ids(), _ids(), array("H")
+        by_creator: Dict[int, array] = {}
+        by_role: Dict[int, array] = {level: _ids() for level in RoleLevel}
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(
+                select(Secret.id, Secret.created_by_user_id, Secret.visible_roles_mask)
+                .order_by(Secret.id)
+                .execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+            )
+            async for secret_id, creator_id, mask in result:
+                mask = mask or 0
+                ids.append(secret_id)
+                creators.append(creator_id or 0)
+                masks.append(mask)
+                by_creator.setdefault(creator_id or 0, _ids()).append(secret_id)
+                for level in RoleLevel:
+                    if mask & role_bit(level):
+                        by_role[level].append(secret_id)
+        self._set_state(ids, creators, masks, by_creator, by_role)
+
+    def _request_rebuild(self) -> None:
+        if self._rebuilding:
+            self._rebuild_again = True
+        elif self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = asyncio.get_running_loop().create_task(self.rebuild())
+
+    def apply_event(self, secret_event: dict) -> None:
+        """Event broker listener: apply one change to the index"""
+        if self._rebuilding:
+            self._pending.append(secret_event)
+            return
+        secret_id = secret_event.get("secret_id")
+        if secret_id is None or (secret_event.get("type") != CHANGE_DELETE and "creator_id" not in secret_event):
+            # Resets and bulk imports do not say which rows changed
+            self._request_rebuild()
+            return
+        if secret_event["type"] == CHANGE_DELETE:
+            self._remove_secret(secret_id)
+        else:
+            self._upsert_secret(secret_id, secret_event["creator_id"], secret_event.get("mask") or 0)
+
+    def _lookup(self, secret_id: int) -> Optional[int]:
+        position = bisect_left(self._ids, secret_id)
+        if position < len(self._ids) and self._ids[position] == secret_id:
+            return position
+        return None
+
+    def _unlink(self, creator_id: int, mask: int, secret_id: int) -> None:
+        _remove(self._by_creator.get(creator_id, _ids()), secret_id)
+        for level in RoleLevel:
+            if mask & role_bit(level):
+                _remove(self._by_role[level], secret_id)
+
+    def _link(self, creator_id: int, mask: int, secret_id: int) -> None:
+        _insert(self._by_creator.setdefault(creator_id, _ids()), secret_id)
+        for level in RoleLevel:
+            if mask & role_bit(level):
+                _insert(self._by_role.setdefault(level, _ids()), secret_id)
+
+    def _upsert_secret(self, secret_id: int, creator_id: int, mask: int) -> None:
+        position = self._lookup(secret_id)
+        if position is None:
+            position = bisect_left(self._ids, secret_id)
+            self._ids.insert(position, secret_id)
+            self._creators.insert(position, creator_id)
+            self._masks.insert(position, mask)
+        else:
+            self._unlink(self._creators[position], self._masks[position], secret_id)
+            self._creators[position] = creator_id
+            self._masks[position] = mask
+        self._link(creator_id, mask, secret_id)
+
+    def _remove_secret(self, secret_id: int) -> None:
+        position = self._lookup(secret_id)
+        if position is None:
+            return
+        self._unlink(self._creators[position], self._masks[position], secret_id)
+        self._ids.pop(position)
+        self._creators.pop(position)
+        self._masks.pop(position)
+
+    def list_ids(
+        self,
+        user: User,
+        include_shared: bool,
+        after_id: int = 0,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[int]:
+        """
+        A page of the ids the user can see, ascending: a lazy merge of the
+        user's own ids and those shared with their role
+        """
+        if include_shared and user.role_level == RoleLevel.OWNER:
+            sources = [self._ids]
+        else:
+            sources = [self._by_creator.get(user.id, _ids())]
+            if include_shared:
+                sources.append(self._by_role.get(user.role_level, _ids()))
+
+        page: List[int] = []
+        previous = None
+        for secret_id in heapq.merge(*(_ids_after(ids, after_id) for ids in sources)):
+            if secret_id == previous:
+                continue
+            previous = secret_id
+            if skip:
+                skip -= 1
+                continue
+            page.append(secret_id)
+            if len(page) == limit:
+                break
+        return page
+
+    async def check_consistency(self, db: AsyncSession) -> List[Tuple[int, List[int], List[int]]]:
+        """
+        Compare the index with Secret.can_access for every active user.
+        Returns (user_id, missing_ids, unexpected_ids) for each mismatch.
+        """
+        secrets = (await db.execute(select(Secret).order_by(Secret.id))).scalars().all()
+        users = (await db.execute(select(User).where(User.is_active.is_(True)))).scalars().all()
+        mismatches = []
+        for user in users:
+            expected = {secret.id for secret in secrets if secret.can_access(user)}
+            indexed = set(self.list_ids(user, include_shared=True, limit=len(self._ids) + 1))
+            if expected != indexed:
+                mismatches.append((user.id, sorted(expected - indexed), sorted(indexed - expected)))
+        return mismatches
+
+@lru_cache
+def get_visibility_index() -> VisibilityIndex:
+    """Get the process-wide visibility index (used when VISIBILITY_INDEX_ENABLED)"""
+    return VisibilityIndex()
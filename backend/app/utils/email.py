@@ -1,7 +1,25 @@
+from functools import lru_cache
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
 from app.core.config import settings
 from pydantic import EmailStr
 
+@lru_cache
+def get_mail_client() -> FastMail:
+    """
+    Build the mail client once per process
+    """
+    conf = ConnectionConfig(
+        MAIL_USERNAME=settings.SMTP_USER or "",
+        MAIL_PASSWORD=settings.SMTP_PASSWORD or "",
+        MAIL_FROM=settings.SMTP_FROM,
+        MAIL_PORT=settings.SMTP_PORT,
+        MAIL_SERVER=settings.SMTP_HOST,
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=settings.SMTP_USE_TLS,
+        USE_CREDENTIALS=bool(settings.SMTP_USER)
+    )
+    return FastMail(conf)
+
 async def send_invitation_email(
     email_to: EmailStr,
     user_name: str,
@@ -9,19 +27,10 @@ async def send_invitation_email(
     invitation_link: str
 ):
     """
-    Send invitation email to new user
+    Send invitation email to new user.
+    Invitations created through the API go through the outbox instead
+    (see app.services.outbox).
     """
-    # Configure email client (you'll need to add SMTP settings to config.py)
-    conf = ConnectionConfig(
-        MAIL_USERNAME=settings.SMTP_USER,
-        MAIL_PASSWORD=settings.SMTP_PASSWORD,
-        MAIL_FROM=settings.SMTP_FROM,
-        MAIL_PORT=settings.SMTP_PORT,
-        MAIL_SERVER=settings.SMTP_HOST,
-        MAIL_SSL_TLS=True,
-        USE_CREDENTIALS=True
-    )
-    
     message = MessageSchema(
         subject=f"Invitation to Join Password Manager - {role_name} Role",
         recipients=[email_to],
@@ -41,5 +50,4 @@ async def send_invitation_email(
         subtype="html"
     )
 
-    fm = FastMail(conf)
-    await fm.send_message(message)
\ No newline at end of file
+    await get_mail_client().send_message(message)
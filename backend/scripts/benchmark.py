@@ -0,0 +1,331 @@
+# backend/scripts/benchmark.py
+"""
+End-to-end API benchmark.
+
+Seeds a database with a synthetic organisation (users at every role level,
+secrets per user, role shares), then drives the API in-process through an
+ASGI client and prints throughput and latency percentiles per endpoint as
+JSON. Run from backend/:
+
+    python scripts/benchmark.py --output baseline.json
+    python scripts/benchmark.py --baseline baseline.json
+
+The database is recreated on every run: a SQLite file is deleted, any other
+database is only dropped and recreated when --reset is given.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+PASSWORD = "benchmark-password"
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./benchmark.db",
+                        help="Database to seed and benchmark against")
+    parser.add_argument("--reset", action="store_true",
+                        help="Drop and recreate all tables of a non-SQLite database")
+    parser.add_argument("--users-per-role", type=int, default=3,
+                        help="Users at each role level below Owner")
+    parser.add_argument("--secrets-per-user", type=int, default=50)
+    parser.add_argument("--share-fraction", type=float, default=0.2,
+                        help="Fraction of each user's secrets that are shared")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Requests per endpoint")
+    parser.add_argument("--login-requests", type=int, default=20,
+                        help="Requests for the login endpoint (bcrypt bound)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", help="Earlier JSON output to compare against")
+    parser.add_argument("--output", help="Write the JSON here instead of stdout")
+    return parser.parse_args()
+
+def prepare_database(args: argparse.Namespace) -> None:
+    """Point the app at the benchmark database; must run before app imports"""
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    if args.database_url.startswith("sqlite:///"):
+        path = Path(args.database_url[len("sqlite:///"):])
+        if path.name and path.exists():
+            path.unlink()
+    elif not args.reset:
+        sys.exit("Refusing to reuse a non-SQLite database; pass --reset to drop its tables")
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class Member:
+    """A seeded user with its token and secrets"""
+    def __init__(self, email: str, role_level: int):
+        self.email = email
+        self.role_level = role_level
+        self.headers: Dict[str, str] = {}
+        self.secret_ids: List[int] = []
+
+async def login(client, email: str):
+    return await client.post("/api/v1/auth/login", data={"username": email, "password": PASSWORD})
+
+async def seed(client, args: argparse.Namespace, rng: random.Random) -> List[Member]:
+    """Create the organisation: users directly in the database, secrets and shares through the API"""
+    from app.core.roles import RoleLevel
+    from app.core.security import get_password_hash
+    from app.database import SessionLocal
+    from app.models.core import User
+    from app.services.versions import bump_versions_sync, team_scopes
+
+    response = await client.post("/api/v1/users/register-first-user", json={
+        "email": "owner@example.com", "password": PASSWORD, "first_name": "Owner"
+    })
+    response.raise_for_status()
+    members = [Member("owner@example.com", RoleLevel.OWNER)]
+
+    # Invitations need email delivery, so the other users are inserted
+    # directly; one hash serves them all since they share a password
+    hashed_password = get_password_hash(PASSWORD)
+    with SessionLocal() as db:
+        for level in RoleLevel:
+            if level == RoleLevel.OWNER:
+                continue
+            for index in range(args.users_per_role):
+                email = f"{level.name.lower()}{index}@example.com"
+                db.add(User(
+                    email=email,
+                    hashed_password=hashed_password,
+                    first_name=level.name.title(),
+                    role_level=level,
+                    is_active=True
+                ))
+                members.append(Member(email, level))
+            bump_versions_sync(db, team_scopes(level))
+        db.commit()
+
+    for member in members:
+        response = await login(client, member.email)
+        response.raise_for_status()
+        member.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        response = await client.post("/api/v1/secrets/import", headers=member.headers, json=[
+            {
+                "title": f"{member.email} secret {index}",
+                "description": f"Synthetic secret {index} for the benchmark",
+                "client_encrypted_data": os.urandom(48).hex()
+            }
+            for index in range(args.secrets_per_user)
+        ])
+        response.raise_for_status()
+        member.secret_ids = response.json()["ids"]
+
+        shared = rng.sample(member.secret_ids, int(len(member.secret_ids) * args.share_fraction))
+        for secret_id in shared:
+            if rng.random() < 0.5:
+                share = {"share_with_all": True, "min_role_level": rng.randint(RoleLevel.INTERN, RoleLevel.OWNER)}
+            else:
+                share = {"role_levels": rng.sample([level.value for level in RoleLevel], 2)}
+            response = await client.post(f"/api/v1/secrets/{secret_id}/share", headers=member.headers, json=share)
+            response.raise_for_status()
+
+    return members
+
+async def measure(
+    count: int,
+    concurrency: int,
+    request: Callable[[int], Awaitable]
+) -> dict:
+    """Issue `count` requests with at most `concurrency` in flight"""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < count:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            response = await request(index)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, count))))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    milliseconds = [latency * 1000 for latency in latencies]
+    return {
+        "requests": count,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(count / elapsed, 1) if elapsed else None,
+        "mean_ms": round(sum(milliseconds) / len(milliseconds), 2) if milliseconds else 0.0,
+        "p50_ms": round(percentile(milliseconds, 50), 2),
+        "p95_ms": round(percentile(milliseconds, 95), 2),
+        "p99_ms": round(percentile(milliseconds, 99), 2),
+        "max_ms": round(milliseconds[-1], 2) if milliseconds else 0.0,
+    }
+
+async def run_scenarios(client, members: List[Member], args: argparse.Namespace, rng: random.Random) -> dict:
+    """Benchmark each endpoint in turn; writes run last so reads see the seeded state"""
+    from app.core.roles import RoleLevel
+
+    readers = [rng.choice(members) for _ in range(args.requests)]
+    managers = [member for member in members if member.role_level >= RoleLevel.MANAGER]
+    created: List[tuple] = []
+
+    async def create(index: int):
+        member = readers[index]
+        response = await client.post("/api/v1/secrets/", headers=member.headers, json={
+            "title": f"Benchmark secret {index}",
+            "description": "Created during the benchmark",
+            "client_encrypted_data": os.urandom(48).hex()
+        })
+        if response.status_code == 200:
+            created.append((member, response.json()["id"]))
+        return response
+
+    def created_secret(index: int) -> tuple:
+        return created[index % len(created)]
+
+    async def update(index: int):
+        member, secret_id = created_secret(index)
+        return await client.put(f"/api/v1/secrets/{secret_id}", headers=member.headers, json={
+            "description": f"Updated {index}"
+        })
+
+    async def share(index: int):
+        member, secret_id = created_secret(index)
+        return await client.post(f"/api/v1/secrets/{secret_id}/share", headers=member.headers, json={
+            "share_with_all": True, "min_role_level": rng.randint(RoleLevel.INTERN, RoleLevel.OWNER)
+        })
+
+    async def remove(index: int):
+        member, secret_id = created_secret(index)
+        return await client.delete(f"/api/v1/secrets/{secret_id}", headers=member.headers)
+
+    scenarios: Dict[str, tuple] = {
+        "POST /auth/login": (
+            args.login_requests,
+            lambda index: login(client, readers[index % len(readers)].email)
+        ),
+        "GET /secrets/": (
+            args.requests,
+            lambda index: client.get("/api/v1/secrets/", headers=readers[index].headers)
+        ),
+        "GET /secrets/?summary=true": (
+            args.requests,
+            lambda index: client.get("/api/v1/secrets/", params={"summary": "true"}, headers=readers[index].headers)
+        ),
+        "GET /secrets/shared-with-me": (
+            args.requests,
+            lambda index: client.get("/api/v1/secrets/shared-with-me", headers=readers[index].headers)
+        ),
+        "GET /secrets/{secret_id}": (
+            args.requests,
+            lambda index: client.get(
+                f"/api/v1/secrets/{rng.choice(readers[index].secret_ids)}",
+                headers=readers[index].headers
+            )
+        ),
+        "GET /users/team-members": (
+            args.requests,
+            lambda index: client.get("/api/v1/users/team-members", headers=managers[index % len(managers)].headers)
+        ),
+        "POST /secrets/": (args.requests, create),
+        "PUT /secrets/{secret_id}": (args.requests, update),
+        "POST /secrets/{secret_id}/share": (args.requests, share),
+        "DELETE /secrets/{secret_id}": (args.requests, remove),
+    }
+
+    results = {}
+    for name, (count, request) in scenarios.items():
+        if name.startswith(("PUT", "DELETE", "POST /secrets/{")):
+            # Each created secret is deleted at most once
+            count = min(count, len(created))
+        results[name] = await measure(count, args.concurrency, request)
+    return results
+
+def compare(results: dict, baseline_path: str) -> None:
+    """Add the relative change against a baseline run to each endpoint"""
+    baseline = json.loads(Path(baseline_path).read_text())["results"]
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        result["vs_baseline"] = {
+            key: round((result[key] - before[key]) / before[key] * 100, 1) if before.get(key) else None
+            for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+        }
+
+async def main(args: argparse.Namespace) -> dict:
+    import httpx
+    from app.database import Base, engine
+    from app.main import app
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+
+    rng = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=app)
+    # Run the app's lifespan, so its background workers and event broker are live
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            started = time.perf_counter()
+            members = await seed(client, args, rng)
+            seed_seconds = time.perf_counter() - started
+            results = await run_scenarios(client, members, args, rng)
+
+    report = {
+        "config": {
+            "database": engine.dialect.name,
+            "users": len(members),
+            "secrets_per_user": args.secrets_per_user,
+            "share_fraction": args.share_fraction,
+            "requests": args.requests,
+            "login_requests": args.login_requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "commit": git_commit(),
+            "python": platform.python_version(),
+        },
+        "seed_seconds": round(seed_seconds, 2),
+        "results": results,
+    }
+    if args.baseline:
+        compare(results, args.baseline)
+    return report
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    prepare_database(arguments)
+    sys.path.insert(0, str(BACKEND_DIR))
+    output = json.dumps(asyncio.run(main(arguments)), indent=2)
+    if arguments.output:
+        Path(arguments.output).write_text(output + "\n")
+    else:
+        print(output)
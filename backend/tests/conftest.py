@@ -0,0 +1,72 @@
+# backend/tests/conftest.py
+"""
+The app runs in-process against a throwaway SQLite database, driven through
+an httpx ASGI client. Run from backend/: python -m pytest
+"""
+import os
+import tempfile
+
+_DATABASE_DIR = tempfile.mkdtemp(prefix="ncrypt-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DATABASE_DIR}/test.db"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+# Every request loads its user, so statement counts do not depend on the cache
+os.environ["USER_CACHE_TTL_SECONDS"] = "0"
+os.environ["EMAIL_OUTBOX_ENABLED"] = "false"
+
+from typing import Dict
+
+import httpx
+import pytest
+from app.core.roles import RoleLevel
+from app.core.security import get_password_hash
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.models.core import User
+from app.services.versions import bump_versions_sync, team_scopes
+
+PASSWORD = "test-password"
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def client():
+    """Client on an empty database; the app's background workers are not started"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+@pytest.fixture
+async def members(client) -> Dict[RoleLevel, Dict[str, str]]:
+    """Authorization headers of one active user per role level"""
+    response = await client.post("/api/v1/users/register-first-user", json={
+        "email": "owner@example.com", "password": PASSWORD, "first_name": "Owner"
+    })
+    response.raise_for_status()
+
+    # Invitations need email delivery, so the other users are inserted directly
+    hashed_password = get_password_hash(PASSWORD)
+    emails = {RoleLevel.OWNER: "owner@example.com"}
+    with SessionLocal() as db:
+        for level in RoleLevel:
+            if level == RoleLevel.OWNER:
+                continue
+            emails[level] = f"{level.name.lower()}@example.com"
+            db.add(User(
+                email=emails[level],
+                hashed_password=hashed_password,
+                first_name=level.name.title(),
+                role_level=level,
+                is_active=True
+            ))
+            bump_versions_sync(db, team_scopes(level))
+        db.commit()
+
+    headers = {}
+    for level, email in emails.items():
+        response = await client.post("/api/v1/auth/login", data={"username": email, "password": PASSWORD})
+        response.raise_for_status()
+        headers[level] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return headers
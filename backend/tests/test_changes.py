@@ -0,0 +1,60 @@
+# backend/tests/test_changes.py
+"""The change feed only reports secrets the caller could see"""
+import pytest
+from app.core.roles import RoleLevel
+
+pytestmark = pytest.mark.anyio
+
+async def create(client, headers, title):
+    response = await client.post("/api/v1/secrets/", headers=headers, json={
+        "title": title, "client_encrypted_data": "ciphertext"
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+async def changes(client, headers, since=0):
+    response = await client.get("/api/v1/secrets/changes", params={"since": since}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+async def test_changes_are_limited_to_the_callers_secrets(client, members):
+    senior, intern = members[RoleLevel.SENIOR], members[RoleLevel.INTERN]
+
+    private_id = await create(client, senior, "private")
+    response = await client.post("/api/v1/secrets/import", headers=senior, json=[
+        {"title": "imported", "client_encrypted_data": "ciphertext"}
+    ])
+    [imported_id] = response.json()["ids"]
+    shared_id = await create(client, senior, "shared")
+    response = await client.post(f"/api/v1/secrets/{shared_id}/share", headers=senior, json={
+        "share_with_all": False, "role_levels": [RoleLevel.INTERN]
+    })
+    assert response.status_code == 200, response.text
+    own_id = await create(client, intern, "own")
+
+    feed = await changes(client, intern)
+    assert [secret["id"] for secret in feed["changes"]] == [shared_id, own_id]
+    assert feed["removed"] == []
+    cursor = feed["next_since"]
+
+    # Later changes nobody shared with the intern only move the cursor
+    await client.put(f"/api/v1/secrets/{private_id}", headers=senior, json={"description": "updated"})
+    feed = await changes(client, intern, cursor)
+    assert feed["changes"] == [] and feed["removed"] == []
+    assert feed["next_since"] > cursor
+    cursor = feed["next_since"]
+
+    # Losing access, and deletion, are reported
+    response = await client.post(f"/api/v1/secrets/{shared_id}/share", headers=senior, json={
+        "share_with_all": True, "min_role_level": RoleLevel.MANAGER
+    })
+    assert response.status_code == 200, response.text
+    await client.delete(f"/api/v1/secrets/{own_id}", headers=intern)
+    feed = await changes(client, intern, cursor)
+    assert feed["changes"] == []
+    assert feed["removed"] == [shared_id, own_id]
+
+    # The owner sees everything
+    feed = await changes(client, members[RoleLevel.OWNER])
+    assert {secret["id"] for secret in feed["changes"]} == {private_id, imported_id, shared_id}
+    assert feed["removed"] == [own_id]
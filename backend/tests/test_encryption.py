@@ -0,0 +1,156 @@
+# backend/tests/test_encryption.py
+import pytest
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet
+from sqlalchemy import func, select
+from app.core import encryption
+from app.core.config import settings
+from app.core.encryption import (
+    current_envelope_prefix, decrypt_chunk, decrypt_data, encrypt_chunk, encrypt_data, encrypt_data_raw
+)
+from app.core.roles import RoleLevel
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models.core import KeyRotationJob, Secret, SecretAttachment, SecretAttachmentChunk
+from app.services.key_rotation import (
+    chunk_needs_rotation_clause, needs_rotation_clause, rotate_batch, start_rotation
+)
+
+pytestmark = pytest.mark.anyio
+
+def reset_keys() -> None:
+    """Drop the engines cached for the previous key settings"""
+    encryption.get_engine.cache_clear()
+    encryption.get_keyring.cache_clear()
+    encryption._attachment_tag_key.cache_clear()
+
+@pytest.fixture
+def rotate_keys(monkeypatch):
+    """Call to make a fresh key current and keep the old one as previous"""
+    old_key = settings.ENCRYPTION_KEY
+
+    def rotate_keys():
+        monkeypatch.setattr(settings, "ENCRYPTION_KEY", Fernet.generate_key().decode())
+        monkeypatch.setattr(settings, "ENCRYPTION_PREVIOUS_KEYS", old_key)
+        reset_keys()
+
+    yield rotate_keys
+    monkeypatch.undo()
+    reset_keys()
+
+async def stale_counts():
+    async with AsyncSessionLocal() as db:
+        secrets = (await db.execute(
+            select(func.count()).select_from(Secret).where(needs_rotation_clause())
+        )).scalar()
+        chunks = (await db.execute(
+            select(func.count()).select_from(SecretAttachmentChunk).where(chunk_needs_rotation_clause())
+        )).scalar()
+    return secrets, chunks
+
+async def rotate(user_id: int) -> None:
+    """Run a key rotation job to completion"""
+    async with AsyncSessionLocal() as db:
+        job = await start_rotation(db, user_id)
+    while True:
+        async with AsyncSessionLocal() as db:
+            if not await rotate_batch(db, job.id):
+                return
+
+async def test_legacy_text_written_after_the_backfill_wins(client, members):
+    owner = members[RoleLevel.OWNER]
+    # A backfilled row the previous release then updated through encrypted_data
+    with SessionLocal() as db:
+        secret = Secret(
+            title="legacy",
+            encrypted_blob=encrypt_data_raw("before"),
+            encrypted_data=encrypt_data("after"),
+            created_by_user_id=1
+        )
+        db.add(secret)
+        db.commit()
+        secret_id = secret.id
+
+    response = await client.get(f"/api/v1/secrets/{secret_id}", headers=owner)
+    assert response.json()["client_encrypted_data"] == "after"
+
+    # Key rotation moves it into the blob and clears the legacy column
+    await rotate(1)
+    with SessionLocal() as db:
+        secret = db.get(Secret, secret_id)
+        assert secret.encrypted_data is None
+        assert decrypt_data(secret.encrypted_blob) == "after"
+
+def test_baseline_fernet_token_decrypts():
+    # Stored as text by releases before the engine switch
+    token = Fernet(settings.ENCRYPTION_KEY).encrypt(b"baseline").decode()
+    assert decrypt_data(token) == "baseline"
+
+def test_envelope_under_a_previous_key_decrypts(rotate_keys, monkeypatch):
+    envelope = encrypt_data_raw("written before the rotation")
+    token = Fernet(settings.ENCRYPTION_KEY).encrypt(b"baseline").decode()
+    rotate_keys()
+
+    assert envelope[:len(current_envelope_prefix())] != current_envelope_prefix()
+    assert decrypt_data(envelope) == "written before the rotation"
+    assert decrypt_data(token) == "baseline"
+
+    monkeypatch.setattr(settings, "ENCRYPTION_PREVIOUS_KEYS", "")
+    reset_keys()
+    with pytest.raises(ValueError):
+        decrypt_data(envelope)
+
+def test_chunk_is_bound_to_its_position():
+    envelope = encrypt_chunk(b"chunk", attachment_id=7, chunk_index=1, is_last=False)
+    assert decrypt_chunk(envelope, 7, 1, False) == b"chunk"
+    for attachment_id, chunk_index, is_last in ((7, 2, False), (7, 1, True), (8, 1, False)):
+        with pytest.raises(InvalidTag):
+            decrypt_chunk(envelope, attachment_id, chunk_index, is_last)
+
+async def test_one_rotation_run_leaves_no_stale_rows(client, members, rotate_keys, monkeypatch):
+    # Every kind of ciphertext a deployment can hold, under the old key
+    with SessionLocal() as db:
+        secrets = [
+            Secret(title="baseline", encrypted_data=Fernet(settings.ENCRYPTION_KEY).encrypt(b"baseline").decode()),
+            Secret(title="legacy", encrypted_data=encrypt_data("legacy")),
+            Secret(title="blob", encrypted_blob=encrypt_data_raw("blob")),
+        ]
+        db.add_all(secrets)
+        db.flush()
+        attachment = SecretAttachment(
+            secret_id=secrets[0].id, filename="file", content_type="text/plain",
+            size=10, chunk_size=5, chunk_count=2
+        )
+        db.add(attachment)
+        db.flush()
+        db.add_all([
+            SecretAttachmentChunk(
+                attachment_id=attachment.id, chunk_index=index,
+                data=encrypt_chunk(b"chunk", attachment.id, index, index == 1)
+            )
+            for index in range(2)
+        ])
+        db.commit()
+        secret_ids = [secret.id for secret in secrets]
+        attachment_id = attachment.id
+
+    rotate_keys()
+    assert await stale_counts() == (3, 2)
+    await rotate(1)
+    assert await stale_counts() == (0, 0)
+    with SessionLocal() as db:
+        job = db.execute(select(KeyRotationJob).order_by(KeyRotationJob.id.desc())).scalars().first()
+        assert (job.passes, job.rotated_count) == (1, 5)
+
+    # Nothing needs the old key any more
+    monkeypatch.setattr(settings, "ENCRYPTION_PREVIOUS_KEYS", "")
+    reset_keys()
+    with SessionLocal() as db:
+        assert [decrypt_data(db.get(Secret, secret_id).ciphertext) for secret_id in secret_ids] == [
+            "baseline", "legacy", "blob"
+        ]
+        chunks = db.execute(
+            select(SecretAttachmentChunk).where(SecretAttachmentChunk.attachment_id == attachment_id)
+            .order_by(SecretAttachmentChunk.chunk_index)
+        ).scalars().all()
+        assert [decrypt_chunk(chunk.data, attachment_id, chunk.chunk_index, chunk.chunk_index == 1)
+                for chunk in chunks] == [b"chunk", b"chunk"]
@@ -0,0 +1,44 @@
+# backend/tests/test_hashing.py
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from app.core.hashing import HashingPool
+
+def wait_idle(pool: HashingPool) -> None:
+    # Done callbacks run just after result() has returned
+    deadline = time.monotonic() + 5
+    while pool.pending and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+def test_cancelled_job_releases_its_slot():
+    pool = HashingPool(workers=1, max_queue=2)
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    running = pool.submit(block)
+    started.wait(5)
+    queued = pool.submit(lambda: None)
+    assert pool.pending == 2
+
+    assert queued.cancel()
+    release.set()
+    running.result(5)
+    wait_idle(pool)
+    assert pool.pending == 0
+
+def test_saturated_pool_rejects_jobs():
+    pool = HashingPool(workers=1, max_queue=0)
+    release = threading.Event()
+    running = pool.submit(release.wait, 5)
+    with pytest.raises(HTTPException) as error:
+        pool.submit(lambda: None)
+    assert error.value.status_code == 503
+    release.set()
+    running.result(5)
+    wait_idle(pool)
+    assert pool.pending == 0
@@ -0,0 +1,23 @@
+# backend/tests/test_metrics.py
+"""In-flight and latency metrics label each request with the same route"""
+import pytest
+from app.core import metrics
+
+pytestmark = pytest.mark.anyio
+
+@pytest.mark.parametrize("path, route", [
+    ("/api/v1/secrets/42", "/api/v1/secrets/{secret_id}"),
+    ("/api/v1/secrets/search", "/api/v1/secrets/search"),
+    ("/metrics", "/metrics"),
+    ("/not/a/route/42", metrics.UNMATCHED_ROUTE),
+])
+async def test_gauge_and_histogram_share_the_route(client, members, monkeypatch, path, route):
+    labelled = []
+    for metric in (metrics.HTTP_REQUESTS_IN_PROGRESS, metrics.HTTP_REQUEST_SECONDS):
+        def spy(*labels, labels_of=metric.labels):
+            labelled.append(labels[:2])
+            return labels_of(*labels)
+        monkeypatch.setattr(metric, "labels", spy)
+
+    await client.get(path, headers=next(iter(members.values())))
+    assert labelled == [("GET", route), ("GET", route)]
@@ -0,0 +1,23 @@
+# backend/tests/test_outbox.py
+from app.services import outbox
+
+class FakeSMTP:
+    def __init__(self, *args, **kwargs):
+        self.sent = []
+
+    def send_message(self, email):
+        self.sent.append(email)
+
+def test_invitation_is_sent_as_plain_text(monkeypatch):
+    monkeypatch.setattr(outbox.smtplib, "SMTP", FakeSMTP)
+    monkeypatch.setattr(outbox.settings, "SMTP_USE_TLS", False)
+    monkeypatch.setattr(outbox.settings, "SMTP_USER", None)
+    message = outbox.render_invitation_email({
+        "invitation_token": "token", "role_name": "Intern", "user_name": "Alex"
+    })
+
+    transport = outbox.SMTPTransport()
+    transport.send("alex@example.com", message)
+    email, = transport._smtp.sent
+    assert email.get_content_type() == "text/plain"
+    assert email.get_content().startswith("Hello Alex,\n\n")
@@ -0,0 +1,116 @@
+# backend/tests/test_query_counts.py
+"""
+Statement counts of the hot secret endpoints. Each case runs at two sizes
+(page size, or role shares on the secret) and must issue the same fixed
+number of statements, so loading per row (N+1) fails the test.
+"""
+import pytest
+from app.core.roles import RoleLevel
+from app.database import count_queries
+
+pytestmark = pytest.mark.anyio
+
+PAGE_SIZES = (5, 25)
+SHARE_COUNTS = (1, 6)
+
+# Statements per request, including loading the current user
+EXPECTED = {
+    "list": 4,  # user, version counters, secrets, role shares (selectin)
+    "shared-with-me": 4,
+    "get": 3,
+    "update": 11,  # includes the change log and version bumps at commit
+    "share": 13,
+}
+
+async def create_secrets(client, headers, count, share=None):
+    response = await client.post("/api/v1/secrets/import", headers=headers, json=[
+        {"title": f"secret {index}", "description": "test", "client_encrypted_data": "ciphertext"}
+        for index in range(count)
+    ])
+    response.raise_for_status()
+    ids = response.json()["ids"]
+    if share is not None:
+        for secret_id in ids:
+            response = await client.post(f"/api/v1/secrets/{secret_id}/share", headers=headers, json=share)
+            response.raise_for_status()
+    return ids
+
+async def shared_data(client, members, count):
+    """Secrets of the owner visible to the manager: half shared with all, half per role"""
+    owner = members[RoleLevel.OWNER]
+    await create_secrets(client, owner, count - count // 2, {
+        "share_with_all": True, "min_role_level": RoleLevel.MANAGER
+    })
+    await create_secrets(client, owner, count // 2, {
+        "share_with_all": False, "role_levels": [RoleLevel.MANAGER, RoleLevel.EXEC]
+    })
+
+async def counted(client, method, url, **kwargs):
+    with count_queries() as queries:
+        response = await client.request(method, url, **kwargs)
+    assert response.status_code == 200, response.text
+    return response, queries.count
+
+def check(case, count):
+    assert count == EXPECTED[case], f"{case}: {count} statements, expected {EXPECTED[case]}"
+
+@pytest.mark.parametrize("page_size", PAGE_SIZES)
+async def test_list_secrets(client, members, page_size):
+    manager = members[RoleLevel.MANAGER]
+    await create_secrets(client, manager, max(PAGE_SIZES))
+    await shared_data(client, members, max(PAGE_SIZES))
+
+    response, count = await counted(client, "GET", "/api/v1/secrets/", params={"limit": page_size}, headers=manager)
+    assert len(response.json()) == page_size
+    # A later page, reached through the cursor, costs the same
+    response, cursor_count = await counted(client, "GET", "/api/v1/secrets/", params={
+        "limit": page_size, "cursor": response.headers["X-Next-Cursor"]
+    }, headers=manager)
+    assert len(response.json()) == page_size
+    assert cursor_count == count
+    check("list", count)
+
+@pytest.mark.parametrize("secret_count", PAGE_SIZES)
+async def test_shared_with_me(client, members, secret_count):
+    await shared_data(client, members, secret_count)
+
+    response, count = await counted(
+        client, "GET", "/api/v1/secrets/shared-with-me", headers=members[RoleLevel.MANAGER]
+    )
+    assert len(response.json()) == secret_count
+    check("shared-with-me", count)
+
+async def role_shared_secret(client, members, share_count):
+    owner = members[RoleLevel.OWNER]
+    [secret_id] = await create_secrets(client, owner, 1, {
+        "share_with_all": False, "role_levels": list(range(RoleLevel.OWNER - share_count, RoleLevel.OWNER))
+    })
+    return secret_id
+
+@pytest.mark.parametrize("share_count", SHARE_COUNTS)
+async def test_get_secret(client, members, share_count):
+    secret_id = await role_shared_secret(client, members, share_count)
+
+    response, count = await counted(client, "GET", f"/api/v1/secrets/{secret_id}", headers=members[RoleLevel.EXEC])
+    assert len(response.json()["role_shares"]) == share_count
+    check("get", count)
+
+@pytest.mark.parametrize("share_count", SHARE_COUNTS)
+async def test_update_secret(client, members, share_count):
+    secret_id = await role_shared_secret(client, members, share_count)
+
+    _, count = await counted(client, "PUT", f"/api/v1/secrets/{secret_id}", json={
+        "description": "updated"
+    }, headers=members[RoleLevel.OWNER])
+    check("update", count)
+
+@pytest.mark.parametrize("share_count", SHARE_COUNTS)
+async def test_share_secret(client, members, share_count):
+    [secret_id] = await create_secrets(client, members[RoleLevel.OWNER], 1)
+
+    response, count = await counted(client, "POST", f"/api/v1/secrets/{secret_id}/share", json={
+        "share_with_all": False,
+        "role_levels": list(range(RoleLevel.OWNER - share_count, RoleLevel.OWNER))
+    }, headers=members[RoleLevel.OWNER])
+    assert len(response.json()["role_shares"]) == share_count
+    check("share", count)
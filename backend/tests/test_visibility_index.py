@@ -0,0 +1,104 @@
+# backend/tests/test_visibility_index.py
+"""
+The in-memory visibility index must list exactly what the SQL path lists,
+after creates, imports, shares and deletes have reached it through the
+event broker.
+"""
+import asyncio
+import random
+
+import pytest
+from app.api.v1.endpoints.secrets import NEXT_CURSOR_HEADER
+from app.core.config import settings
+from app.core.roles import RoleLevel
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.services.visibility import get_visibility_index
+
+pytestmark = pytest.mark.anyio
+
+async def settle(index) -> None:
+    """Wait for after-commit dispatch and any rebuild an import requested"""
+    await asyncio.sleep(0)
+    for _ in range(500):
+        rebuild = index._rebuild_task
+        if index.ready and not index._rebuilding and (rebuild is None or rebuild.done()):
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("The visibility index did not settle")
+
+async def listing(client, headers, include_shared, page_size=None):
+    """Every secret id the listing returns, following cursors when paged"""
+    params = {"include_shared": include_shared, "summary": True, "limit": page_size or 10000}
+    ids = []
+    while True:
+        response = await client.get("/api/v1/secrets/", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        ids += [secret["id"] for secret in response.json()]
+        if page_size is None or NEXT_CURSOR_HEADER not in response.headers:
+            return ids
+        params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+
+async def test_index_matches_sql(client, members, monkeypatch):
+    monkeypatch.setattr(settings, "VISIBILITY_INDEX_ENABLED", True)
+    rng = random.Random(1)
+    levels = list(members)
+    index = get_visibility_index()
+
+    async with app.router.lifespan_context(app):
+        await settle(index)
+        secrets = []
+
+        async def create(level):
+            response = await client.post("/api/v1/secrets/", headers=members[level], json={
+                "title": "secret", "client_encrypted_data": "ciphertext"
+            })
+            assert response.status_code == 200, response.text
+            secrets.append((response.json()["id"], level))
+
+        for _ in range(40):
+            await create(rng.choice(levels))
+        response = await client.post("/api/v1/secrets/import", headers=members[RoleLevel.SENIOR], json=[
+            {"title": "imported", "client_encrypted_data": "ciphertext"} for _ in range(5)
+        ])
+        assert response.status_code == 200, response.text
+        secrets += [(secret_id, RoleLevel.SENIOR) for secret_id in response.json()["ids"]]
+        await settle(index)
+
+        for _ in range(80):
+            secret_id, level = rng.choice(secrets)
+            operation = rng.random()
+            if operation < 0.5:
+                if rng.random() < 0.5:
+                    share = {"share_with_all": True, "min_role_level": rng.randint(RoleLevel.INTERN, RoleLevel.OWNER)}
+                else:
+                    share = {"share_with_all": False, "role_levels": rng.sample(range(RoleLevel.INTERN, RoleLevel.OWNER + 1), 2)}
+                response = await client.post(f"/api/v1/secrets/{secret_id}/share", headers=members[level], json=share)
+                assert response.status_code in (200, 404), response.text
+            elif operation < 0.7:
+                response = await client.delete(f"/api/v1/secrets/{secret_id}", headers=members[level])
+                assert response.status_code in (204, 404), response.text
+            else:
+                await create(rng.choice(levels))
+        await settle(index)
+
+        async with AsyncSessionLocal() as db:
+            assert await index.check_consistency(db) == []
+
+        for level, headers in members.items():
+            for include_shared in (True, False):
+                indexed = await listing(client, headers, include_shared, page_size=7)
+                monkeypatch.setattr(settings, "VISIBILITY_INDEX_ENABLED", False)
+                expected = await listing(client, headers, include_shared)
+                monkeypatch.setattr(settings, "VISIBILITY_INDEX_ENABLED", True)
+                assert indexed == expected, (level, include_shared)
+
+        # Index pages can trail the counters behind the ETag, so they get none
+        headers = members[RoleLevel.MANAGER]
+        response = await client.get("/api/v1/secrets/", headers=headers)
+        assert "ETag" not in response.headers
+        monkeypatch.setattr(settings, "VISIBILITY_INDEX_ENABLED", False)
+        etag = (await client.get("/api/v1/secrets/", headers=headers)).headers["ETag"]
+        monkeypatch.setattr(settings, "VISIBILITY_INDEX_ENABLED", True)
+        response = await client.get("/api/v1/secrets/", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200